@@ -4,6 +4,15 @@ import time
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ApplicationBuilder, ContextTypes, CommandHandler, MessageHandler, CallbackQueryHandler, filters
 from app.core.bot_core import UnifiedBot
+from app.core.config import (METRICS_PORT, TELEGRAM_MODE, TELEGRAM_WEBHOOK_HOST, TELEGRAM_WEBHOOK_PORT,
+                             TELEGRAM_WEBHOOK_PATH, TELEGRAM_WEBHOOK_SECRET, TELEGRAM_WEBHOOK_URL)
+from app.core.metrics import metrics
+from app.core.supervisor import start_heartbeat
+from app.core.worker import InboundRouter
+from app.core import tracing
+from app.core.traffic_recorder import traffic_recorder
+from app.core.dedup import dedup_store
+from app.core.shutdown import install_shutdown_hook, run_shutdown_hooks
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -17,11 +26,17 @@ logging.basicConfig(
 import threading
 import asyncio
 
-def run_telegram_bot(queues):
+def run_telegram_bot(queues, heartbeat=None, inbound=None):
     print("🚀 Starting Telegram Bot...")
+    install_shutdown_hook() # SIGTERM/SIGINT exit cleanly; queued conversation turns are flushed
     
-    # Initialize Unified Bot with Queues for IPC
-    bot_core = UnifiedBot(queues)
+    # Sharded mode: worker processes run UnifiedBot; this process only receives and sends
+    router = InboundRouter(inbound) if inbound else None
+    bot_core = None if router else UnifiedBot(queues) # With Queues for IPC
+    if metrics.enabled and METRICS_PORT:
+        metrics.start_http_server(METRICS_PORT + 1) # WhatsApp process owns METRICS_PORT
+    if heartbeat is not None:
+        start_heartbeat(heartbeat, bot_core.busy_for if bot_core else None)
     
     # Initialize Application
     telegram_token = os.getenv("TELEGRAM_BOT_TOKEN")
@@ -60,14 +75,17 @@ def run_telegram_bot(queues):
                         try:
                             with open(image_path, 'rb') as photo:
                                 loop.run_until_complete(bot.send_photo(chat_id=target, photo=photo, caption=text, parse_mode='Markdown'))
-                            print(f"🖼️ IPC -> Telegram: Sent Photo to {target}")
+                            latency_ms = tracing.record_delivery(item, "telegram")
+                            print(f"🖼️ IPC -> Telegram: Sent Photo to {target}{tracing.describe(item, latency_ms)}")
                         except Exception as e:
                             # Fallback if send_photo fails
                             loop.run_until_complete(bot.send_message(chat_id=target, text=f"{text}\n\n📎 [File]: {image_path}", parse_mode='Markdown'))
-                            print(f"📥 IPC -> Telegram: Sent Message (Photo Fallback) to {target}: {e}")
+                            latency_ms = tracing.record_delivery(item, "telegram")
+                            print(f"📥 IPC -> Telegram: Sent Message (Photo Fallback) to {target}: {e}{tracing.describe(item, latency_ms)}")
                     elif text:
                         loop.run_until_complete(bot.send_message(chat_id=target, text=text, parse_mode='Markdown'))
-                        print(f"💬 IPC -> Telegram: Sent Message to {target}")
+                        latency_ms = tracing.record_delivery(item, "telegram")
+                        print(f"💬 IPC -> Telegram: Sent Message to {target}{tracing.describe(item, latency_ms)}")
                         
             except Exception as e:
                 print(f"⚠️ Telegram IPC Listener Warning: {e}")
@@ -85,6 +103,8 @@ def run_telegram_bot(queues):
         )
 
     async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        if dedup_store.is_duplicate("telegram", f"{update.effective_chat.id}:{update.message.message_id}"):
+            return # Redelivered after a reconnect or restart
         sender_id = str(update.effective_user.id)
         text = update.message.text or update.message.caption
         media_path = None
@@ -98,8 +118,14 @@ def run_telegram_bot(queues):
             print(f"🖼️ Telegram Image Downloaded: {media_path}")
 
         if not text and not media_path: return
+        traffic_recorder.record("telegram", sender_id, text, has_media=bool(media_path))
 
-        response = bot_core.handle_message(text or "", "telegram", sender_id, media_path=media_path)
+        if router:
+            router.submit("telegram", sender_id, text, reply_to=update.effective_chat.id, media_path=media_path)
+            return # The owning worker replies through the outbound queue
+
+        response = bot_core.handle_message(text or "", "telegram", sender_id, media_path=media_path,
+                                           reply_to=update.effective_chat.id)
         
         if response:
             await context.bot.send_message(
@@ -116,8 +142,18 @@ def run_telegram_bot(queues):
     application.add_handler(message_handler)
     application.add_handler(command_handler)
     
-    application.run_polling()
+    try:
+        if TELEGRAM_MODE == "webhook":
+            from app.bots.telegram_webhook import run_webhook
+            asyncio.run(run_webhook(application, TELEGRAM_WEBHOOK_HOST, TELEGRAM_WEBHOOK_PORT, TELEGRAM_WEBHOOK_PATH,
+                                    TELEGRAM_WEBHOOK_SECRET, TELEGRAM_WEBHOOK_URL))
+        else:
+            application.run_polling() # Installs its own SIGTERM/SIGINT handling and returns after stopping
+    finally:
+        run_shutdown_hooks()
 
 if __name__ == '__main__':
+    from app.core.database import init_db
+    init_db() # main.py does this once for both bots
     run_telegram_bot(None) # For local test only
 
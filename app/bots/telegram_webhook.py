@@ -0,0 +1,92 @@
+import asyncio
+import hmac
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from telegram import Update
+from app.core.metrics import metrics
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+class WebhookServer:
+    """
+    Minimal Telegram webhook receiver.
+    Each POST to the secret path is checked against the secret-token header,
+    decoded with `Update.de_json` and handed to the application's update queue on
+    its event loop, so the usual handlers process it exactly as with polling.
+    Telegram only needs a fast 200; handling happens asynchronously.
+    """
+
+    def __init__(self, bot, update_queue, loop, host, port, path, secret=""):
+        self.bot = bot
+        self.update_queue = update_queue
+        self.loop = loop
+        self.path = "/" + path.strip("/")
+        self.secret = secret
+        self.received = 0
+        self.rejected = 0
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+
+    @property
+    def address(self):
+        return self._server.server_address
+
+    def _make_handler(self):
+        webhook = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # Keep-alive: Telegram reuses connections
+
+            def _reply(self, code):
+                self.send_response(code)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length)
+                if self.path != webhook.path:
+                    return self._reply(404)
+                if webhook.secret and not hmac.compare_digest(self.headers.get(SECRET_HEADER, ""), webhook.secret):
+                    webhook.rejected += 1
+                    metrics.incr("telegram.webhook.rejected")
+                    return self._reply(403)
+                try:
+                    update = Update.de_json(json.loads(body), webhook.bot)
+                except Exception:
+                    return self._reply(400)
+                asyncio.run_coroutine_threadsafe(webhook.update_queue.put(update), webhook.loop)
+                webhook.received += 1
+                metrics.incr("telegram.webhook.updates")
+                self._reply(200)
+
+            def log_message(self, *args):
+                pass # One line per update would flood the console
+
+        return Handler
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, name="TelegramWebhook", daemon=True).start()
+        host, port = self.address[:2]
+        print(f"🪝 Telegram webhook listening on http://{host}:{port}{self.path}")
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+async def run_webhook(application, host, port, path, secret="", public_url=None):
+    """Webhook counterpart of `application.run_polling()`: start the app, serve updates until cancelled."""
+    await application.initialize()
+    if public_url:
+        await application.bot.set_webhook(url=public_url.rstrip("/") + "/" + path.strip("/"),
+                                          secret_token=secret or None, allowed_updates=Update.ALL_TYPES)
+    await application.start()
+    server = WebhookServer(application.bot, application.update_queue, asyncio.get_running_loop(), host, port, path, secret)
+    server.start()
+    try:
+        await asyncio.Event().wait() # Serve until the process is stopped
+    finally:
+        server.stop()
+        await application.stop()
+        await application.shutdown()
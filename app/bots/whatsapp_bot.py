@@ -1,12 +1,17 @@
 import os
-import signal
-import sys
 import time
 from neonize.client import NewClient
 from neonize.events import ConnectedEv, MessageEv, PairStatusEv
 from neonize.types import MessageServerID
 from app.core.bot_core import UnifiedBot
-from app.core.config import BOT_WHATSAPP_NUMBER, WHATSAPP_SESSION
+from app.core.config import BOT_WHATSAPP_NUMBER, WHATSAPP_SESSION, METRICS_PORT
+from app.core.metrics import metrics
+from app.core.supervisor import start_heartbeat
+from app.core.worker import InboundRouter
+from app.core import tracing
+from app.core.traffic_recorder import traffic_recorder
+from app.core.dedup import dedup_store
+from app.core.shutdown import install_shutdown_hook, run_shutdown_hooks
 from app.core.database import get_inactive_users
 from dotenv import load_dotenv
 from colorama import Fore, Style
@@ -15,11 +20,17 @@ load_dotenv()
 
 import threading
 
-def run_whatsapp_bot(queues, login_info=None):
+def run_whatsapp_bot(queues, login_info=None, heartbeat=None, inbound=None):
     print("🚀 Starting WhatsApp Bot (Unified)...")
+    install_shutdown_hook() # SIGTERM/SIGINT exit cleanly; queued conversation turns are flushed
     
-    # Initialize Unified Bot with Queues for IPC
-    bot_core = UnifiedBot(queues)
+    # Sharded mode: worker processes run UnifiedBot; this process only receives and sends
+    router = InboundRouter(inbound) if inbound else None
+    bot_core = None if router else UnifiedBot(queues) # With Queues for IPC
+    if metrics.enabled and METRICS_PORT:
+        metrics.start_http_server(METRICS_PORT)
+    if heartbeat is not None:
+        start_heartbeat(heartbeat, bot_core.busy_for if bot_core else None)
 
     # Initialize Neonize Client
     client = NewClient(WHATSAPP_SESSION)
@@ -48,14 +59,17 @@ def run_whatsapp_bot(queues, login_info=None):
                     if image_path and os.path.exists(image_path):
                         try:
                             client.send_image(target, image_path, caption=text)
-                            print(f"🖼️ IPC -> WhatsApp: Sent Image to {target}")
+                            latency_ms = tracing.record_delivery(item, "whatsapp")
+                            print(f"🖼️ IPC -> WhatsApp: Sent Image to {target}{tracing.describe(item, latency_ms)}")
                         except Exception as e:
                             # Fallback if send_image fails/not available
                             client.send_message(target, f"{text}\n\n📎 [Attachment]: {image_path}")
-                            print(f"📥 IPC -> WhatsApp: Sent Message (Image Fallback) to {target}: {e}")
+                            latency_ms = tracing.record_delivery(item, "whatsapp")
+                            print(f"📥 IPC -> WhatsApp: Sent Message (Image Fallback) to {target}: {e}{tracing.describe(item, latency_ms)}")
                     elif text:
                         client.send_message(target, text)
-                        print(f"💬 IPC -> WhatsApp: Sent Message to {target}")
+                        latency_ms = tracing.record_delivery(item, "whatsapp")
+                        print(f"💬 IPC -> WhatsApp: Sent Message to {target}{tracing.describe(item, latency_ms)}")
                         
             except Exception as e:
                 print(f"⚠️ WhatsApp IPC Listener Warning: {e}")
@@ -87,12 +101,6 @@ def run_whatsapp_bot(queues, login_info=None):
         print("⚠️ EngagementManager not found or failed to load. Continuing without it.")
         pass
 
-    def interrupt_handler(signum, frame):
-        print("🔴 Interrupt received, shutting down...")
-        sys.exit(0)
-
-    signal.signal(signal.SIGINT, interrupt_handler)
-
     @client.event(ConnectedEv)
     def on_connected(event: ConnectedEv):
         print("✅ WhatsApp Connected!")
@@ -109,6 +117,8 @@ def run_whatsapp_bot(queues, login_info=None):
             chat_info = message.Info
             if chat_info.IsFromMe:
                 return
+            if dedup_store.is_duplicate("whatsapp", chat_info.ID):
+                return # Redelivered after a reconnect or restart
 
             sender = chat_info.RemoteJid
 
@@ -131,9 +141,14 @@ def run_whatsapp_bot(queues, login_info=None):
                 return
 
             print(f"📩 Message from {sender}: {text or '[Image]'}")
+            traffic_recorder.record("whatsapp", sender, text, has_media=bool(media_path))
+
+            if router:
+                router.submit("whatsapp", sender, text, reply_to=sender, media_path=media_path)
+                return # The owning worker replies through the outbound queue
 
             # Process message via UnifiedBot
-            response_text = bot_core.handle_message(text, "whatsapp", sender, media_path=media_path)
+            response_text = bot_core.handle_message(text, "whatsapp", sender, media_path=media_path, reply_to=sender)
             
             if response_text:
                 print(f"📤 Replying: {response_text}")
@@ -159,8 +174,13 @@ def run_whatsapp_bot(queues, login_info=None):
             print("📱 Please scan the QR code below when it appears.")
 
     print(f"{Fore.WHITE}Connecting to WhatsApp...{Style.RESET_ALL}")
-    client.connect()
+    try:
+        client.connect()
+    finally:
+        run_shutdown_hooks()
 
 if __name__ == "__main__":
+    from app.core.database import init_db
+    init_db() # main.py does this once for both bots
     run_whatsapp_bot()
 
@@ -0,0 +1,84 @@
+import threading
+import time
+from app.core.database import get_active_chat, set_active_chat, get_user_by_id, are_friends, is_blocked
+from app.core.social_graph import social_graph
+
+def resolve_route(contact):
+    """Pick (platform, platform_id) for a contact: preferred platform first, then the other one."""
+    pref_plat = contact.get('preferred_platform') or 'whatsapp'
+    plat_id = contact.get('whatsapp_id') if pref_plat == 'whatsapp' else contact.get('telegram_id')
+    if not plat_id:
+        other_plat = 'telegram' if pref_plat == 'whatsapp' else 'whatsapp'
+        plat_id = contact.get('whatsapp_id') if other_plat == 'whatsapp' else contact.get('telegram_id')
+        if plat_id:
+            pref_plat = other_plat
+    return pref_plat, plat_id
+
+class DirectChatSession:
+    """Everything needed to tunnel one user's messages to their /chat partner."""
+
+    def __init__(self, user_id, target):
+        self.target_id = target['id']
+        self.target_username = target['username']
+        self.platform, self.platform_id = resolve_route(target)
+        self.graph_version = social_graph.current_version()
+        self.created_at = time.monotonic()
+
+        # Permission verdict, re-evaluated whenever the social graph changes
+        self.error = None
+        if is_blocked(user_id, self.target_id):
+            self.error = "❌ You are blocked by this user."
+        elif not are_friends(user_id, self.target_id):
+            self.error = "❌ You can only message your friends."
+        elif not self.platform_id:
+            self.error = f"❌ {self.target_username} has not linked a reachable account on any platform."
+
+class ChatSessionCache:
+    """
+    Per-user cache of the active /chat session (or of "no active chat").
+    Entries are dropped on /exit, rebuilt when the social graph version moves
+    (block, unfriend, ...) and refreshed after a short TTL to pick up route changes.
+    """
+
+    TTL = 60 # seconds
+
+    def __init__(self, ttl=TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {} # user_id -> (DirectChatSession | None, loaded_at)
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+        if entry and now - entry[1] <= self.ttl:
+            session = entry[0]
+            if session is None or session.graph_version == social_graph.current_version():
+                return session
+            target_id = session.target_id
+        else:
+            target_id = get_active_chat(user_id)
+        return self._build(user_id, target_id)
+
+    def _build(self, user_id, target_id):
+        session = None
+        if target_id:
+            target = get_user_by_id(target_id)
+            if target:
+                session = DirectChatSession(user_id, target)
+        with self._lock:
+            self._entries[user_id] = (session, time.monotonic())
+        return session
+
+    def open(self, user_id, target_id):
+        set_active_chat(user_id, target_id)
+        return self._build(user_id, target_id)
+
+    def close(self, user_id):
+        set_active_chat(user_id, None)
+        with self._lock:
+            self._entries[user_id] = (None, time.monotonic())
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
@@ -21,6 +21,17 @@ init(autoreset=True)
 
 load_dotenv()
 
+# Compiled once; the fallback engine runs these on every message it answers
+_WHITESPACE = re.compile(r'\s+')
+_NAME_IS = re.compile(r"my name is (.+?)(?:\.|$|!|\?)")
+_I_AM = re.compile(r"i'm (.+?)(?:\.|$|!|\?)")
+_MATH_PATTERNS = [ # Checked in this order, first match wins
+    (re.compile(r"(\d+)\s*\+\s*(\d+)"), "+"),
+    (re.compile(r"(\d+)\s*-\s*(\d+)"), "-"),
+    (re.compile(r"(\d+)\s*\*\s*(\d+)"), "*"),
+    (re.compile(r"(\d+)\s*/\s*(\d+)"), "/"),
+]
+
 class ChatBot:
     """A realistic chatbot with proper error handling and emoji support."""
     
@@ -31,6 +42,9 @@ class ChatBot:
         self.user_name: Optional[str] = None
         self.emotion_state = "neutral"
         self.knowledge_base = self._initialize_knowledge_base()
+        # (intent, keywords, count) flattened once; plain `in` checks beat any matcher at this size (~50 keywords)
+        self._intent_keywords = tuple((intent, tuple(keywords), len(keywords)) for intent, keywords in self.knowledge_base.items())
+        self._last_preprocessed = (None, "") # (raw, cleaned): one message is cleaned once, not per helper
         self.response_templates = self._initialize_response_templates()
         self.greeting_count = 0
         self.error_count = 0
@@ -131,9 +145,12 @@ class ChatBot:
             if not isinstance(user_input, str):
                 raise TypeError("Input must be a string!")
             
-            user_input = user_input.strip().lower()
-            user_input = re.sub(r'\s+', ' ', user_input)
-            return user_input
+            raw, cleaned = self._last_preprocessed
+            if raw == user_input:
+                return cleaned
+            cleaned = _WHITESPACE.sub(' ', user_input.strip().lower())
+            self._last_preprocessed = (user_input, cleaned)
+            return cleaned
         except TypeError as e:
             self.error_count += 1
             return ""
@@ -149,16 +166,15 @@ class ChatBot:
             if not processed_input:
                 return "unknown", 0.0
             
+            # Fraction of each intent's keywords present in the input
             intent_scores = {}
-            
-            for intent, keywords in self.knowledge_base.items():
-                score = 0.0
+            for intent, keywords, count in self._intent_keywords:
+                hits = 0
                 for keyword in keywords:
                     if keyword in processed_input:
-                        score += 1
-                
-                if score > 0:
-                    intent_scores[intent] = score / len(keywords)
+                        hits += 1
+                if hits:
+                    intent_scores[intent] = hits / count
             
             if not intent_scores:
                 return "default", 0.0
@@ -177,11 +193,11 @@ class ChatBot:
             processed_input = self.preprocess_input(user_input)
             
             if "my name is" in processed_input:
-                name_match = re.search(r"my name is (.+?)(?:\.|$|!|\?)", processed_input)
+                name_match = _NAME_IS.search(processed_input)
                 if name_match:
                     self.user_name = name_match.group(1).strip().title()
             elif "i'm" in processed_input and "chatbot" not in processed_input:
-                name_match = re.search(r"i'm (.+?)(?:\.|$|!|\?)", processed_input)
+                name_match = _I_AM.search(processed_input)
                 if name_match:
                     self.user_name = name_match.group(1).strip().title()
         except Exception as e:
@@ -192,28 +208,24 @@ class ChatBot:
         try:
             processed_input = self.preprocess_input(user_input)
             
-            math_patterns = [
-                r"(\d+)\s*\+\s*(\d+)",
-                r"(\d+)\s*-\s*(\d+)",
-                r"(\d+)\s*\*\s*(\d+)",
-                r"(\d+)\s*/\s*(\d+)",
-            ]
+            if not any(ch.isdigit() for ch in processed_input):
+                return None
             
-            for pattern in math_patterns:
-                match = re.search(pattern, processed_input)
+            for pattern, op in _MATH_PATTERNS:
+                match = pattern.search(processed_input)
                 if match:
                     num1, num2 = int(match.group(1)), int(match.group(2))
                     
-                    if '+' in match.group(0):
+                    if op == '+':
                         result = num1 + num2
                         return f"🧮 {num1} + {num2} = {result}"
-                    elif '-' in match.group(0):
+                    elif op == '-':
                         result = num1 - num2
                         return f"🧮 {num1} - {num2} = {result}"
-                    elif '*' in match.group(0):
+                    elif op == '*':
                         result = num1 * num2
                         return f"🧮 {num1} × {num2} = {result}"
-                    elif '/' in match.group(0):
+                    elif op == '/':
                         if num2 == 0:
                             return "❌ Cannot divide by zero! 0️⃣"
                         result = num1 / num2
@@ -232,7 +244,7 @@ class ChatBot:
     
     def generate_response(self, user_input: str, user_api_key: Optional[str] = None, 
                           system_instruction: Optional[str] = None, history: list = None,
-                          media_path: Optional[str] = None) -> str:
+                          media_path: Optional[str] = None, prompt_key: Optional[str] = None) -> str:
         """Generate an appropriate response based on user input."""
         try:
             if not user_input and not media_path:
@@ -247,12 +259,24 @@ class ChatBot:
                 return self.llm_handler.generate_response(user_input, user_api_key=user_api_key, 
                                                          system_instruction=system_instruction,
                                                          history=history,
-                                                         image_path=media_path)
+                                                         image_path=media_path,
+                                                         prompt_key=prompt_key)
             
             # Fallback if LLM is not available
+            return self.generate_local_response(user_input)
+        except Exception as e:
+            self.error_count += 1
+            return f"❌ Unexpected error occurred! Please try again. 🔧 Error: {e}"
+
+    def generate_local_response(self, user_input: str, user_name: Optional[str] = None) -> str:
+        """Template-based reply without the LLM (no API key, or shedding load).
+        Pass `user_name` when one ChatBot serves many users: the instance's own name is left untouched."""
+        try:
             intent, confidence = self.extract_intent(user_input)
             
-            self.extract_user_info(user_input)
+            if user_name is None:
+                self.extract_user_info(user_input)
+            user_name = user_name or self.user_name
             
             math_result = self.handle_math(user_input)
             if math_result:
@@ -274,13 +298,13 @@ class ChatBot:
             response = response.format(
                 bot_name=self.name,
                 time=self.get_current_time(),
-                user_name=self.user_name or "friend"
+                user_name=user_name or "friend"
             )
             
             if intent == "greeting":
                 self.greeting_count += 1
-                if self.user_name:
-                    response = f"Hello {self.user_name}! 👋 {response}"
+                if user_name:
+                    response = f"Hello {user_name}! 👋 {response}"
             
             return response
         except Exception as e:
@@ -0,0 +1,97 @@
+import threading
+import time
+from app.core.config import CHAT_COALESCE_SECONDS, CHAT_COALESCE_MAX_WAIT_SECONDS
+from app.core.metrics import metrics
+
+class _Pending:
+    __slots__ = ("texts", "context", "generation", "first_at", "timer")
+
+    def __init__(self):
+        self.texts = []        # Messages not yet answered, oldest first
+        self.context = None    # Context passed with the latest message
+        self.generation = 0    # Bumped by every message; a flush is only delivered if still current
+        self.first_at = 0.0
+        self.timer = None
+
+class MessageCoalescer:
+    """
+    Per-user debounce for chat text. Each message (re)starts a short quiet-time timer;
+    when it fires, everything the user sent since their last answered message goes out
+    as one request via `on_flush(key, text, context, generation)`.
+    A message arriving while that request is still running supersedes it: the next
+    flush repeats the unanswered text plus the new message, and `finish()` tells the
+    older request to drop its reply.
+    """
+
+    def __init__(self, on_flush, window=CHAT_COALESCE_SECONDS, max_wait=CHAT_COALESCE_MAX_WAIT_SECONDS):
+        self.on_flush = on_flush
+        self.window = window
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._pending = {} # key -> _Pending
+
+    def submit(self, key, text, context=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                entry = self._pending[key] = _Pending()
+            if not entry.texts:
+                entry.first_at = now
+            elif entry.timer is not None:
+                metrics.incr("coalesce.merged")
+            entry.texts.append(text)
+            entry.context = context
+            entry.generation += 1
+            if entry.timer is not None:
+                entry.timer.cancel()
+            # Keep waiting while the user types, but never past max_wait from their first unanswered message
+            delay = max(0.0, min(self.window, entry.first_at + self.max_wait - now))
+            entry.timer = threading.Timer(delay, self._fire, args=(key, entry.generation))
+            entry.timer.daemon = True
+            entry.timer.start()
+
+    def _fire(self, key, generation):
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None or entry.generation != generation or entry.timer is None:
+                return # A newer message rescheduled this flush, or flush_pending() already took it
+            entry.timer = None
+            text = "\n".join(entry.texts)
+            context = entry.context
+        self._deliver(key, text, context, generation)
+
+    def _deliver(self, key, text, context, generation):
+        try:
+            self.on_flush(key, text, context, generation)
+        except Exception as e:
+            print(f"❌ Coalesced reply failed for {key}: {e}")
+            self.finish(key, generation)
+
+    def flush_pending(self):
+        """Shutdown: answer every user still inside their quiet window now, on the calling thread."""
+        due = []
+        with self._lock:
+            for key, entry in self._pending.items():
+                if entry.timer is None:
+                    continue # Already being answered
+                entry.timer.cancel()
+                entry.timer = None
+                due.append((key, "\n".join(entry.texts), entry.context, entry.generation))
+        for key, text, context, generation in due:
+            self._deliver(key, text, context, generation)
+        return len(due)
+
+    def finish(self, key, generation):
+        """Called when a flush completes. True if its reply should be delivered, False if superseded."""
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None or entry.generation != generation:
+                metrics.incr("coalesce.superseded")
+                return False
+            del self._pending[key]
+            return True
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
@@ -17,3 +17,72 @@ if not os.path.exists(DATA_DIR):
 
 DB_NAME = os.path.join(DATA_DIR, os.getenv("DB_NAME", "whatsapp_bot.db"))
 WHATSAPP_SESSION = os.path.join(DATA_DIR, "whatsapp_session.sqlite3")
+
+# Background Jobs
+SUGGESTION_REFRESH_SECONDS = int(os.getenv("SUGGESTION_REFRESH_SECONDS", "60"))
+STORY_SWEEP_SECONDS = int(os.getenv("STORY_SWEEP_SECONDS", "300"))
+RETENTION_INTERVAL_SECONDS = int(os.getenv("RETENTION_INTERVAL_SECONDS", "3600"))
+
+# Conversation Retention (older turns move to compressed, encrypted archive blocks)
+CONVERSATION_RETENTION_DAYS = int(os.getenv("CONVERSATION_RETENTION_DAYS", "30"))
+CONVERSATION_HOT_TURNS = int(os.getenv("CONVERSATION_HOT_TURNS", "20")) # Always kept hot per user
+
+# Conversation State (registration / OTP flows)
+STATE_TTL_SECONDS = int(os.getenv("STATE_TTL_SECONDS", "1800"))
+STATE_NEGATIVE_CACHE_SIZE = int(os.getenv("STATE_NEGATIVE_CACHE_SIZE", "50000")) # Ids remembered as having no flow
+
+# Metrics (per-stage latency histograms; near-zero overhead when disabled)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "0").lower() in ("1", "true", "yes")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0")) # 0 = no HTTP endpoint; WhatsApp uses PORT, Telegram PORT+1, supervisor PORT+2, worker N PORT+3+N
+
+# Traffic Recording (opt-in; anonymized inbound events for replay_traffic.py)
+TRAFFIC_RECORD_PATH = os.getenv("TRAFFIC_RECORD_PATH") # Unset = recording off
+TRAFFIC_RECORD_SALT = os.getenv("TRAFFIC_RECORD_SALT", "")
+
+# Process Supervisor (main.py)
+SUPERVISOR_HEARTBEAT_SECONDS = float(os.getenv("SUPERVISOR_HEARTBEAT_SECONDS", "5"))
+SUPERVISOR_HANG_SECONDS = float(os.getenv("SUPERVISOR_HANG_SECONDS", "120")) # No heartbeat, or one message busy this long
+SUPERVISOR_MAX_BACKOFF_SECONDS = float(os.getenv("SUPERVISOR_MAX_BACKOFF_SECONDS", "60"))
+SUPERVISOR_CRASH_LOOP_LIMIT = int(os.getenv("SUPERVISOR_CRASH_LOOP_LIMIT", "5")) # Restarts allowed per window
+SUPERVISOR_CRASH_LOOP_WINDOW = float(os.getenv("SUPERVISOR_CRASH_LOOP_WINDOW", "300"))
+SUPERVISOR_COOLDOWN_SECONDS = float(os.getenv("SUPERVISOR_COOLDOWN_SECONDS", "600")) # Pause after a crash loop
+
+# Sharded Workers (0 = each platform process runs UnifiedBot itself)
+WORKER_SHARDS = int(os.getenv("WORKER_SHARDS", "0"))
+
+# Telegram Ingestion ("polling" or "webhook")
+TELEGRAM_MODE = os.getenv("TELEGRAM_MODE", "polling").lower()
+TELEGRAM_WEBHOOK_HOST = os.getenv("TELEGRAM_WEBHOOK_HOST", "127.0.0.1") # Put a TLS reverse proxy in front
+TELEGRAM_WEBHOOK_PORT = int(os.getenv("TELEGRAM_WEBHOOK_PORT", "8443"))
+TELEGRAM_WEBHOOK_PATH = os.getenv("TELEGRAM_WEBHOOK_PATH", "telegram") # Keep it unguessable
+TELEGRAM_WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET", "")     # Checked against X-Telegram-Bot-Api-Secret-Token
+TELEGRAM_WEBHOOK_URL = os.getenv("TELEGRAM_WEBHOOK_URL")               # Public URL registered with set_webhook (optional)
+
+# Inbound Dedup (redelivered platform messages after reconnects / restarts)
+DEDUP_TTL_SECONDS = int(os.getenv("DEDUP_TTL_SECONDS", "86400")) # Telegram keeps retrying an update for up to a day
+DEDUP_MEMORY_SIZE = int(os.getenv("DEDUP_MEMORY_SIZE", "10000")) # Recent ids answered without touching SQLite
+
+# Chat Coalescing (rapid-fire messages from one user become one LLM request)
+CHAT_COALESCE_SECONDS = float(os.getenv("CHAT_COALESCE_SECONDS", "1.5")) # Quiet time before replying; 0 = off
+CHAT_COALESCE_MAX_WAIT_SECONDS = float(os.getenv("CHAT_COALESCE_MAX_WAIT_SECONDS", "5")) # Never defer a reply longer
+
+# Outbound IPC Lanes (weights for fair draining: higher = more sends per round)
+IPC_LANE_WEIGHTS = {
+    "critical": int(os.getenv("IPC_WEIGHT_CRITICAL", "8")),       # OTP codes
+    "interactive": int(os.getenv("IPC_WEIGHT_INTERACTIVE", "4")), # Replies, private messages, friend events
+    "bulk": int(os.getenv("IPC_WEIGHT_BULK", "1")),               # Broadcasts, follower notifications
+}
+
+# Inbound Rate Limiting (token buckets: refill per minute, burst size)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1").lower() in ("1", "true", "yes")
+RATE_LIMITS = {
+    "chat": (float(os.getenv("RATE_CHAT_PER_MINUTE", "20")), int(os.getenv("RATE_CHAT_BURST", "8"))),
+    "command": (float(os.getenv("RATE_COMMAND_PER_MINUTE", "40")), int(os.getenv("RATE_COMMAND_BURST", "15"))),
+    "heavy": (float(os.getenv("RATE_HEAVY_PER_MINUTE", "4")), int(os.getenv("RATE_HEAVY_BURST", "2"))), # LLM-backed commands
+    "auth": (float(os.getenv("RATE_AUTH_PER_MINUTE", "6")), int(os.getenv("RATE_AUTH_BURST", "4"))),    # Slows password / OTP guessing
+}
+# Global LLM budget for the whole deployment; beyond it chat falls back to the local template replies.
+# Each process running UnifiedBot enforces an equal share (workers when sharded, else the two bot processes).
+LLM_GLOBAL_PER_MINUTE = float(os.getenv("LLM_GLOBAL_PER_MINUTE", "600"))
+LLM_GLOBAL_BURST = int(os.getenv("LLM_GLOBAL_BURST", "30"))
+LLM_BUDGET_PROCESSES = max(1, int(os.getenv("LLM_BUDGET_PROCESSES", str(WORKER_SHARDS or 2))))
@@ -0,0 +1,126 @@
+import multiprocessing.util
+import queue
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from app.core.config import DB_NAME
+from app.core.security import security_manager
+from app.core.database import get_chat_history
+
+class ConversationLogger:
+    """
+    Append-only conversation log stage, off the reply path.
+    `log()` only enqueues; a background thread encrypts records in batches and
+    commits each batch in one transaction. When the bounded queue is full the
+    caller writes its record synchronously (backpressure), and everything still
+    queued is flushed on shutdown.
+    """
+
+    BATCH_SIZE = 64
+    FLUSH_INTERVAL = 0.5 # seconds a partial batch may wait
+    PUT_TIMEOUT = 1.0    # seconds to wait for queue space before writing inline
+
+    _STOP = object()
+
+    def __init__(self, maxsize=1000):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._pending = {}                     # user_id -> records queued but not yet committed
+        self._pending_lock = threading.Lock()
+        self._commit_lock = threading.Lock()   # commit + un-pend happen atomically for readers
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.backpressure_writes = 0
+
+    def _ensure_started(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="ConversationLogger", daemon=True)
+            self._thread.start()
+            # atexit never runs in multiprocessing children (every bot and worker); Finalize does,
+            # on a normal return and on the SystemExit the shutdown signal handler raises
+            multiprocessing.util.Finalize(self, self.close, exitpriority=10)
+
+    def log(self, user_id, message, response):
+        """Queue one turn for persistence; returns immediately unless the queue is full."""
+        # Stamp now (UTC, like CURRENT_TIMESTAMP) so history order reflects when the turn happened
+        record = (user_id, message, response, datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'))
+        with self._pending_lock:
+            self._pending.setdefault(user_id, []).append(record)
+        self._ensure_started()
+        try:
+            self._queue.put(record, timeout=self.PUT_TIMEOUT)
+        except queue.Full:
+            self.backpressure_writes += 1
+            self._write([record])
+
+    def history(self, user_id, limit=10):
+        """Recent turns including ones still waiting in the queue (read-your-writes)."""
+        with self._commit_lock:
+            stored = get_chat_history(user_id, limit=limit)
+            with self._pending_lock:
+                queued = [(r[1], r[2]) for r in self._pending.get(user_id, [])]
+        return (stored + queued)[-limit:]
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get()
+            except Exception:
+                continue
+            if first is self._STOP:
+                self._queue.task_done()
+                return
+            batch = [first]
+            stop = False
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    item = self._queue.get(timeout=self.FLUSH_INTERVAL)
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            try:
+                self._write(batch)
+            except Exception as e:
+                print(f"❌ Conversation log batch failed ({len(batch)} records): {e}")
+            for _ in range(len(batch) + (1 if stop else 0)):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, records):
+        rows = [(user_id, security_manager.encrypt(msg), security_manager.encrypt(res), ts)
+                for user_id, msg, res, ts in records]
+        with self._commit_lock:
+            conn = sqlite3.connect(DB_NAME)
+            conn.execute("PRAGMA journal_mode=WAL;")
+            try:
+                conn.executemany("INSERT INTO conversations (user_id, message, response, timestamp) VALUES (?, ?, ?, ?)", rows)
+                conn.commit()
+            finally:
+                conn.close()
+            with self._pending_lock:
+                for record in records:
+                    queued = self._pending.get(record[0])
+                    if queued and record in queued:
+                        queued.remove(record)
+                        if not queued:
+                            del self._pending[record[0]]
+
+    def flush(self):
+        """Block until everything queued so far is committed."""
+        if self._thread and self._thread.is_alive():
+            self._queue.join()
+
+    def close(self):
+        """Durable shutdown: drain the queue, then stop the worker."""
+        if self._thread and self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+
+conversation_logger = ConversationLogger()
@@ -1,11 +1,17 @@
 import sqlite3
+import sys
 import json
+import zlib
 import bcrypt
-from app.core.config import DB_NAME
+from app.core.config import DB_NAME, CONVERSATION_HOT_TURNS
 from app.core.security import security_manager
+from app.core.social_graph import social_graph, bump_graph_version
+from app.core.metrics import metrics
+from app.core.personas import BUILTIN_PERSONAS, persona_registry
 
 def init_db():
     conn = sqlite3.connect(DB_NAME)
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL;") # Only takes effect on a fresh database
     conn.execute("PRAGMA journal_mode=WAL;")
     c = conn.cursor()
     
@@ -24,6 +30,9 @@ def init_db():
                     avatar_url TEXT,
                     bio TEXT
                 )''')
+    # Every inbound message resolves its sender by platform id
+    c.execute("CREATE INDEX IF NOT EXISTS idx_users_whatsapp ON users(whatsapp_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_users_telegram ON users(telegram_id)")
     
     # Conversations table (linked to user)
     c.execute('''CREATE TABLE IF NOT EXISTS conversations (
@@ -34,13 +43,28 @@ def init_db():
                     timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY(user_id) REFERENCES users(id)
                 )''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_conversations_user_ts ON conversations(user_id, timestamp)")
+
+    # Conversation Archive (compressed + encrypted blocks of old turns, per user)
+    c.execute('''CREATE TABLE IF NOT EXISTS conversation_archive (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER,
+                    first_ts DATETIME,
+                    last_ts DATETIME,
+                    turn_count INTEGER,
+                    payload BLOB,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY(user_id) REFERENCES users(id)
+                )''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_conversation_archive_user ON conversation_archive(user_id)")
 
     # User States table (for conversational flow)
     c.execute('''CREATE TABLE IF NOT EXISTS user_states (
                     platform_id TEXT PRIMARY KEY,
                     platform TEXT,
                     state TEXT,
-                    data TEXT
+                    data TEXT,
+                    updated_at DATETIME
                 )''')
 
     # Friends table
@@ -53,6 +77,9 @@ def init_db():
                     FOREIGN KEY(user1_id) REFERENCES users(id),
                     FOREIGN KEY(user2_id) REFERENCES users(id)
                 )''')
+    # Friendship lookups come from either side of the pair
+    c.execute("CREATE INDEX IF NOT EXISTS idx_friends_pair ON friends(user1_id, user2_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_friends_user2 ON friends(user2_id, status)")
 
     # Groups table
     c.execute('''CREATE TABLE IF NOT EXISTS groups (
@@ -93,6 +120,21 @@ def init_db():
                     FOREIGN KEY(from_id) REFERENCES users(id),
                     FOREIGN KEY(to_id) REFERENCES users(id)
                 )''')
+    # Inbox keyset pagination walks (to_id, id); the partial index keeps bulk mark-read cheap
+    c.execute("CREATE INDEX IF NOT EXISTS idx_pm_inbox ON private_messages(to_id, id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_pm_unread ON private_messages(to_id, id) WHERE is_read = 0")
+
+    # Unread counters (kept current on insert/read so badges never need COUNT scans)
+    c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'inbox_counters'")
+    counters_exist = c.fetchone() is not None
+    c.execute('''CREATE TABLE IF NOT EXISTS inbox_counters (
+                    user_id INTEGER PRIMARY KEY,
+                    unread INTEGER DEFAULT 0,
+                    FOREIGN KEY(user_id) REFERENCES users(id)
+                )''')
+    if not counters_exist:
+        c.execute('''INSERT INTO inbox_counters (user_id, unread)
+                     SELECT to_id, COUNT(*) FROM private_messages WHERE is_read = 0 GROUP BY to_id''')
 
     # Posts table (v4.0)
     c.execute('''CREATE TABLE IF NOT EXISTS posts (
@@ -115,6 +157,9 @@ def init_db():
                     expires_at DATETIME,
                     FOREIGN KEY(user_id) REFERENCES users(id)
                 )''')
+    # Live-story lookups range over expires_at; per-author listing walks (user_id, created_at)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_stories_expires ON stories(expires_at)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_stories_user_created ON stories(user_id, created_at)")
 
     # Reactions table (v4.0)
     c.execute('''CREATE TABLE IF NOT EXISTS reactions (
@@ -128,6 +173,8 @@ def init_db():
                     FOREIGN KEY(story_id) REFERENCES stories(id),
                     FOREIGN KEY(user_id) REFERENCES users(id)
                 )''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_reactions_story ON reactions(story_id)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_reactions_post ON reactions(post_id)")
 
     # Achievements table (v4.0)
     c.execute('''CREATE TABLE IF NOT EXISTS achievements (
@@ -148,6 +195,7 @@ def init_db():
                     FOREIGN KEY(follower_id) REFERENCES users(id),
                     FOREIGN KEY(followed_id) REFERENCES users(id)
                 )''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_follows_followed ON follows(followed_id)")
 
     # Post Analytics / Views table (v5.0)
     c.execute('''CREATE TABLE IF NOT EXISTS post_views (
@@ -158,6 +206,7 @@ def init_db():
                     FOREIGN KEY(post_id) REFERENCES posts(id),
                     FOREIGN KEY(viewer_id) REFERENCES users(id)
                 )''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_post_views_post_viewer ON post_views(post_id, viewer_id)")
 
     # Reports table
     c.execute('''CREATE TABLE IF NOT EXISTS reports (
@@ -168,6 +217,48 @@ def init_db():
                     timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY(user_id) REFERENCES users(id)
                 )''')
+
+    # System metadata (shared counters across bot processes)
+    c.execute('''CREATE TABLE IF NOT EXISTS system_meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER DEFAULT 0
+                )''')
+    c.execute("INSERT OR IGNORE INTO system_meta (key, value) VALUES ('social_graph_version', 0)")
+
+    # Friend Suggestions ("People you may know", precomputed top-K per user)
+    c.execute('''CREATE TABLE IF NOT EXISTS friend_suggestions (
+                    user_id INTEGER,
+                    candidate_id INTEGER,
+                    score INTEGER, -- mutual friend count
+                    computed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY(user_id, candidate_id),
+                    FOREIGN KEY(user_id) REFERENCES users(id),
+                    FOREIGN KEY(candidate_id) REFERENCES users(id)
+                )''')
+
+    # Users whose suggestions must be recomputed after a graph change
+    c.execute('''CREATE TABLE IF NOT EXISTS suggestion_dirty (
+                    user_id INTEGER PRIMARY KEY
+                )''')
+
+    # Personas (built-ins are plain shared text; users reference them by id)
+    c.execute('''CREATE TABLE IF NOT EXISTS personas (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT UNIQUE,
+                    prompt TEXT NOT NULL,
+                    is_builtin INTEGER DEFAULT 0,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )''')
+    c.executemany('''INSERT INTO personas (id, name, prompt, is_builtin) VALUES (?, ?, ?, 1)
+                     ON CONFLICT(id) DO UPDATE SET name = excluded.name, prompt = excluded.prompt, is_builtin = 1''',
+                  BUILTIN_PERSONAS)
+
+    # Inbound platform message ids already handled (dedup of redeliveries, TTL-swept)
+    c.execute('''CREATE TABLE IF NOT EXISTS processed_events (
+                    event_key TEXT PRIMARY KEY, -- "<platform>:<message id>"
+                    seen_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )''')
+    c.execute("CREATE INDEX IF NOT EXISTS idx_processed_events_seen ON processed_events(seen_at)")
     
     # Migrations
     columns = [
@@ -188,7 +279,8 @@ def init_db():
         ("is_verified", "INTEGER DEFAULT 0"), # v4.0 Diamond logic
         ("level", "INTEGER DEFAULT 1"),
         ("account_type", "TEXT DEFAULT 'personal'"), # v5.0 Creator Edition
-        ("is_professional", "INTEGER DEFAULT 0")
+        ("is_professional", "INTEGER DEFAULT 0"),
+        ("persona_id", "INTEGER") # personas.id; NULL = custom prompt (encrypted in system_prompt)
     ]
     
     for col_name, col_type in columns:
@@ -198,6 +290,28 @@ def init_db():
         except sqlite3.OperationalError:
             pass # Column likely exists
             
+    # User States Migrations (TTL sweep needs a last-touched time)
+    try:
+        c.execute("ALTER TABLE user_states ADD COLUMN updated_at DATETIME")
+        conn.commit()
+    except sqlite3.OperationalError:
+        pass # Column likely exists
+    c.execute("UPDATE user_states SET updated_at = CURRENT_TIMESTAMP WHERE updated_at IS NULL")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_user_states_updated ON user_states(updated_at)")
+
+    # Persona Migration: users holding an encrypted copy of a built-in persona get a reference instead (runs once)
+    c.execute("SELECT value FROM system_meta WHERE key = 'personas_migrated'")
+    migrated = c.fetchone()
+    if not migrated or not migrated[0]:
+        builtin_ids = {prompt: pid for pid, _, prompt in BUILTIN_PERSONAS}
+        c.execute("SELECT id, system_prompt FROM users WHERE persona_id IS NULL AND system_prompt IS NOT NULL AND system_prompt != ''")
+        for u_id, enc_prompt in c.fetchall():
+            pid = builtin_ids.get(security_manager.decrypt(enc_prompt))
+            if pid:
+                c.execute("UPDATE users SET persona_id = ?, system_prompt = NULL WHERE id = ?", (pid, u_id))
+        c.execute("INSERT OR REPLACE INTO system_meta (key, value) VALUES ('personas_migrated', 1)")
+        conn.commit()
+
     # Posts Table Migrations (v5.0)
     post_columns = [
         ("visibility", "TEXT DEFAULT 'public'"), # public/private/archive
@@ -229,6 +343,8 @@ def register_user(username, email, password, platform=None, platform_id=None, av
     recovery_key = secrets.token_hex(8)
     
     try:
+        hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
         # PII Encryption (v6.0 Cyber-Secure)
         enc_email = security_manager.encrypt(email)
         enc_bio = security_manager.encrypt(bio) if bio else None
@@ -257,13 +373,16 @@ def register_user(username, email, password, platform=None, platform_id=None, av
         conn.close()
 
 def update_system_prompt(user_id, system_prompt):
-    """Update the user's custom system prompt (persona)."""
+    """Update the user's persona: shared personas are referenced by id, only custom text is encrypted."""
+    persona_id = persona_registry.id_for(system_prompt)
+    if persona_id is not None:
+        return set_user_persona(user_id, persona_id)
     conn = sqlite3.connect(DB_NAME)
     conn.execute("PRAGMA journal_mode=WAL;")
     c = conn.cursor()
     try:
         enc_prompt = security_manager.encrypt(system_prompt)
-        c.execute("UPDATE users SET system_prompt = ? WHERE id = ?", (enc_prompt, user_id))
+        c.execute("UPDATE users SET system_prompt = ?, persona_id = NULL WHERE id = ?", (enc_prompt, user_id))
         conn.commit()
         return True, "✅ Persona updated successfully!"
     except Exception as e:
@@ -271,17 +390,63 @@ def update_system_prompt(user_id, system_prompt):
     finally:
         conn.close()
 
+def set_user_persona(user_id, persona_id):
+    """Point the user at a shared persona (drops any custom prompt)."""
+    conn = sqlite3.connect(DB_NAME)
+    conn.execute("PRAGMA journal_mode=WAL;")
+    c = conn.cursor()
+    try:
+        c.execute("UPDATE users SET persona_id = ?, system_prompt = NULL WHERE id = ?", (persona_id, user_id))
+        conn.commit()
+        return True, "✅ Persona updated successfully!"
+    except Exception as e:
+        return False, f"Error updating persona: {e}"
+    finally:
+        conn.close()
+
+def _resolve_system_prompt(persona_id, enc_prompt):
+    """Shared persona text from memory, otherwise the user's own (encrypted) prompt."""
+    if persona_id is not None:
+        prompt = persona_registry.get(persona_id)
+        if prompt is not None:
+            return prompt
+    return security_manager.decrypt(enc_prompt)
+
 def get_user_system_prompt(user_id):
     """Retrieve the user's custom system prompt."""
     conn = sqlite3.connect(DB_NAME)
     c = conn.cursor()
-    c.execute("SELECT system_prompt FROM users WHERE id = ?", (user_id,))
+    c.execute("SELECT persona_id, system_prompt FROM users WHERE id = ?", (user_id,))
     result = c.fetchone()
     conn.close()
-    if result and result[0]:
-        return security_manager.decrypt(result[0])
+    if result and (result[0] is not None or result[1]):
+        return _resolve_system_prompt(result[0], result[1])
     return None
 
+def get_personas():
+    """All shared personas as (id, name, prompt), built-ins first."""
+    conn = sqlite3.connect(DB_NAME)
+    c = conn.cursor()
+    c.execute("SELECT id, name, prompt FROM personas ORDER BY is_builtin DESC, id")
+    rows = c.fetchall()
+    conn.close()
+    return rows
+
+def create_persona(name, prompt):
+    """Add a shared (non built-in) persona that users can reference by id."""
+    conn = sqlite3.connect(DB_NAME)
+    c = conn.cursor()
+    try:
+        c.execute("INSERT INTO personas (name, prompt, is_builtin) VALUES (?, ?, 0)", (name, prompt))
+        persona_id = c.lastrowid
+        conn.commit()
+    except sqlite3.IntegrityError:
+        return None
+    finally:
+        conn.close()
+    persona_registry.add(persona_id, prompt)
+    return persona_id
+
 # Updated get_user_by_platform to return system_prompt
 def get_user_by_platform(platform, platform_id):
     """Retrieve user with decrypted API key and system prompt."""
@@ -289,15 +454,15 @@ def get_user_by_platform(platform, platform_id):
     conn.execute("PRAGMA journal_mode=WAL;")
     c = conn.cursor()
     if platform == "whatsapp":
-        c.execute("SELECT id, username, gemini_api_key, system_prompt, is_verified, level FROM users WHERE whatsapp_id = ?", (platform_id,))
+        c.execute("SELECT id, username, gemini_api_key, system_prompt, is_verified, level, persona_id FROM users WHERE whatsapp_id = ?", (platform_id,))
     elif platform == "telegram":
-        c.execute("SELECT id, username, gemini_api_key, system_prompt, is_verified, level FROM users WHERE telegram_id = ?", (platform_id,))
+        c.execute("SELECT id, username, gemini_api_key, system_prompt, is_verified, level, persona_id FROM users WHERE telegram_id = ?", (platform_id,))
     user = c.fetchone()
     conn.close()
     if user:
-        u_list = list(user)
+        u_list = list(user[:6])
         u_list[2] = security_manager.decrypt(u_list[2]) # Gemini Key
-        u_list[3] = security_manager.decrypt(u_list[3]) # System Prompt
+        u_list[3] = _resolve_system_prompt(user[6], u_list[3]) # System Prompt (shared personas skip the decrypt)
         return tuple(u_list)
     return user
 
@@ -447,9 +612,9 @@ def set_state(platform_id, platform, state, data=None):
     conn.execute("PRAGMA journal_mode=WAL;")
     c = conn.cursor()
     data_json = json.dumps(data) if data else "{}"
-    c.execute('''INSERT INTO user_states (platform_id, platform, state, data) 
-                 VALUES (?, ?, ?, ?) 
-                 ON CONFLICT(platform_id) DO UPDATE SET state=?, data=?''', 
+    c.execute('''INSERT INTO user_states (platform_id, platform, state, data, updated_at) 
+                 VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP) 
+                 ON CONFLICT(platform_id) DO UPDATE SET state=?, data=?, updated_at=CURRENT_TIMESTAMP''', 
               (platform_id, platform, state, data_json, state, data_json))
     conn.commit()
     conn.close()
@@ -473,8 +638,43 @@ def clear_state(platform_id):
     conn.commit()
     conn.close()
 
+def purge_stale_states(max_age_seconds):
+    """Delete conversation states untouched for longer than `max_age_seconds`."""
+    conn = sqlite3.connect(DB_NAME)
+    c = conn.cursor()
+    c.execute("DELETE FROM user_states WHERE updated_at < datetime('now', ?)", (f"-{int(max_age_seconds)} seconds",))
+    removed = c.rowcount
+    conn.commit()
+    conn.close()
+    return removed
+
+# --- Inbound Event Dedup ---
+def claim_event(event_key):
+    """Record an inbound event id. True the first time it is seen, False for a redelivery."""
+    conn = sqlite3.connect(DB_NAME)
+    c = conn.cursor()
+    c.execute("INSERT OR IGNORE INTO processed_events (event_key) VALUES (?)", (event_key,))
+    claimed = c.rowcount == 1
+    conn.commit()
+    conn.close()
+    return claimed
+
+def purge_processed_events(max_age_seconds):
+    """Forget inbound event ids older than `max_age_seconds`."""
+    conn = sqlite3.connect(DB_NAME)
+    c = conn.cursor()
+    c.execute("DELETE FROM processed_events WHERE seen_at < datetime('now', ?)", (f"-{int(max_age_seconds)} seconds",))
+    removed = c.rowcount
+    conn.commit()
+    conn.close()
+    return removed
+
 # --- Social Functions ---
 
+def _mark_suggestions_dirty(c, user_ids):
+    """Queue users for suggestion recompute (inside the caller's transaction)."""
+    c.executemany("INSERT OR IGNORE INTO suggestion_dirty (user_id) VALUES (?)", [(u,) for u in user_ids])
+
 def send_friend_request(from_id, to_username):
     """Send a friend request by username."""
     conn = sqlite3.connect(DB_NAME)
@@ -521,21 +721,24 @@ def accept_friend_request(user_id, from_username):
     
     c.execute("UPDATE friends SET status = 'accepted' WHERE user1_id = ? AND user2_id = ? AND status = 'pending'", (from_id, user_id))
     if c.rowcount > 0:
+        version = bump_graph_version(c)
+        _mark_suggestions_dirty(c, {user_id, from_id} | social_graph.friend_ids(user_id) | social_graph.friend_ids(from_id))
         conn.commit()
         conn.close()
+        social_graph.add_friendship(user_id, from_id, version)
         return True, f"✅ You are now friends with {from_username}!"
     conn.close()
     return False, "❌ No pending request from that user."
 
 def get_friends(user_id):
-    """List all accepted friends."""
+    """List all accepted friends (ids from the in-memory social graph, one lookup for the names)."""
+    ids = sorted(social_graph.friend_ids(user_id))
+    if not ids:
+        return []
     conn = sqlite3.connect(DB_NAME)
     c = conn.cursor()
-    c.execute('''SELECT username FROM users WHERE id IN (
-                    SELECT user2_id FROM friends WHERE user1_id = ? AND status = 'accepted'
-                    UNION
-                    SELECT user1_id FROM friends WHERE user2_id = ? AND status = 'accepted'
-                 )''', (user_id, user_id))
+    placeholders = ",".join("?" * len(ids))
+    c.execute(f"SELECT username FROM users WHERE id IN ({placeholders})", ids)
     friends = [f[0] for f in c.fetchall()]
     conn.close()
     return friends
@@ -605,8 +808,13 @@ def get_chat_history(user_id, limit=15):
     c = conn.cursor()
     c.execute('''SELECT message, response FROM conversations 
                  WHERE user_id = ? 
-                 ORDER BY timestamp DESC LIMIT ?''', (user_id, limit))
+                 ORDER BY timestamp DESC, id DESC LIMIT ?''', (user_id, limit))
     history = c.fetchall()
+    # Retention keeps each user's newest CONVERSATION_HOT_TURNS hot, so only a user with at least
+    # that many (but fewer than `limit`) hot turns can have older ones in the archive
+    archived = []
+    if CONVERSATION_HOT_TURNS <= len(history) < limit:
+        archived = _archived_history(c, user_id, limit - len(history))
     conn.close()
     
     decrypted_history = []
@@ -616,10 +824,18 @@ def get_chat_history(user_id, limit=15):
             security_manager.decrypt(res)
         ))
     
-    return decrypted_history[::-1]
-
-# Initialize on import
-init_db()
+    return archived + decrypted_history[::-1]
+
+def _archived_history(c, user_id, limit):
+    """Newest `limit` archived turns as (message, response), oldest first (blocks are decrypted newest first)."""
+    c.execute("SELECT payload FROM conversation_archive WHERE user_id = ? ORDER BY last_ts DESC, id DESC", (user_id,))
+    turns = []
+    for (payload,) in c:
+        block = json.loads(zlib.decompress(security_manager.decrypt_bytes(payload)))
+        turns[:0] = [(msg, res) for _ts, msg, res in block]
+        if len(turns) >= limit:
+            break
+    return turns[-limit:]
 
 def block_user(user_id, target_username):
     conn = sqlite3.connect(DB_NAME)
@@ -631,7 +847,10 @@ def block_user(user_id, target_username):
         return False, "User not found."
     try:
         c.execute("INSERT INTO blocked_users (user_id, blocked_user_id) VALUES (?, ?)", (user_id, target[0]))
+        version = bump_graph_version(c)
+        _mark_suggestions_dirty(c, (user_id, target[0]))
         conn.commit()
+        social_graph.add_block(user_id, target[0], version)
         return True, f"User {target_username} blocked."
     except sqlite3.IntegrityError:
         return False, "User already blocked."
@@ -645,19 +864,18 @@ def unblock_user(user_id, target_username):
     target = c.fetchone()
     if target:
         c.execute("DELETE FROM blocked_users WHERE user_id = ? AND blocked_user_id = ?", (user_id, target[0]))
+        version = bump_graph_version(c)
+        _mark_suggestions_dirty(c, (user_id, target[0]))
         conn.commit()
         conn.close()
+        social_graph.remove_block(user_id, target[0], version)
         return True, f"User {target_username} unblocked."
     conn.close()
     return False, "User not found."
 
 def is_blocked(user_id, target_id):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute("SELECT 1 FROM blocked_users WHERE user_id = ? AND blocked_user_id = ?", (target_id, user_id))
-    blocked = c.fetchone() is not None
-    conn.close()
-    return blocked
+    """Check whether `target_id` has blocked `user_id` (served from the social graph)."""
+    return social_graph.has_blocked(target_id, user_id)
 
 def set_preferred_platform(user_id, platform):
     conn = sqlite3.connect(DB_NAME)
@@ -677,11 +895,18 @@ def get_user_contact_info(username):
         return {"id": res[0], "whatsapp_id": res[1], "telegram_id": res[2], "preferred_platform": res[3]}
     return None
 
+def _bump_unread(c, user_id, delta):
+    """Adjust a user's unread counter inside the caller's transaction."""
+    c.execute('''INSERT INTO inbox_counters (user_id, unread) VALUES (?, MAX(?, 0))
+                 ON CONFLICT(user_id) DO UPDATE SET unread = MAX(unread + ?, 0)''', (user_id, delta, delta))
+
 def log_private_message(from_id, to_id, content):
+    """Store a delivered private message (encrypted) and bump the recipient's unread counter."""
     conn = sqlite3.connect(DB_NAME)
     conn.execute("PRAGMA journal_mode=WAL;")
     c = conn.cursor()
-    c.execute("INSERT INTO private_messages (from_id, to_id, content) VALUES (?, ?, ?)", (from_id, to_id, content))
+    c.execute("INSERT INTO private_messages (from_id, to_id, content) VALUES (?, ?, ?)", (from_id, to_id, security_manager.encrypt(content)))
+    _bump_unread(c, to_id, 1)
     conn.commit()
     conn.close()
 
@@ -709,8 +934,11 @@ def remove_friend(user_id, friend_username):
         f_id = friend[0]
         c.execute("DELETE FROM friends WHERE (user1_id = ? AND user2_id = ?) OR (user1_id = ? AND user2_id = ?)", 
                   (user_id, f_id, f_id, user_id))
+        version = bump_graph_version(c)
+        _mark_suggestions_dirty(c, {user_id, f_id} | social_graph.friend_ids(user_id) | social_graph.friend_ids(f_id))
         conn.commit()
         conn.close()
+        social_graph.remove_friendship(user_id, f_id, version)
         return True, f"Friendship with {friend_username} removed."
     conn.close()
     return False, "Friend not found."
@@ -747,6 +975,7 @@ def send_private_message(from_id, to_username, content):
         to_id = to_user[0]
         enc_content = security_manager.encrypt(content)
         c.execute("INSERT INTO private_messages (from_id, to_id, content) VALUES (?, ?, ?)", (from_id, to_id, enc_content))
+        _bump_unread(c, to_id, 1)
         conn.commit()
         conn.close()
         return True, to_user
@@ -755,22 +984,56 @@ def send_private_message(from_id, to_username, content):
 
 def get_private_messages(user_id, limit=20):
     """Fetch and decrypt recent private messages."""
+    messages, _ = get_inbox(user_id, limit=limit)
+    return messages
+
+def get_inbox(user_id, before_id=None, limit=10):
+    """
+    Keyset-paginated inbox, newest first.
+    Returns (messages, next_cursor); pass next_cursor as `before_id` for the next page.
+    """
     conn = sqlite3.connect(DB_NAME)
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
-    c.execute('''SELECT pm.*, users.username as from_username FROM private_messages pm
+    c.execute('''SELECT pm.id, pm.from_id, pm.content, pm.timestamp, pm.is_read, users.username AS from_username
+                 FROM private_messages pm
                  JOIN users ON pm.from_id = users.id
-                 WHERE pm.to_id = ? 
-                 ORDER BY pm.timestamp DESC LIMIT ?''', (user_id, limit))
+                 WHERE pm.to_id = ? AND pm.id < ?
+                 ORDER BY pm.id DESC LIMIT ?''', (user_id, before_id if before_id else 2**63 - 1, limit + 1))
     rows = c.fetchall()
     conn.close()
-    
+
     messages = []
-    for row in rows:
+    for row in rows[:limit]:
         d = dict(row)
         d['content'] = security_manager.decrypt(d['content'])
         messages.append(d)
-    return messages
+    next_cursor = messages[-1]['id'] if len(rows) > limit else None
+    return messages, next_cursor
+
+def get_unread_count(user_id):
+    """Unread private messages for a user (single primary-key lookup)."""
+    conn = sqlite3.connect(DB_NAME)
+    c = conn.cursor()
+    c.execute("SELECT unread FROM inbox_counters WHERE user_id = ?", (user_id,))
+    res = c.fetchone()
+    conn.close()
+    return res[0] if res else 0
+
+def mark_inbox_read(user_id, up_to_id=None):
+    """Mark all unread messages (optionally only up to `up_to_id`) as read in one statement."""
+    conn = sqlite3.connect(DB_NAME)
+    c = conn.cursor()
+    if up_to_id:
+        c.execute("UPDATE private_messages SET is_read = 1 WHERE to_id = ? AND is_read = 0 AND id <= ?", (user_id, up_to_id))
+    else:
+        c.execute("UPDATE private_messages SET is_read = 1 WHERE to_id = ? AND is_read = 0", (user_id,))
+    marked = c.rowcount
+    if marked:
+        _bump_unread(c, user_id, -marked)
+    conn.commit()
+    conn.close()
+    return marked
 
 def get_social_feed(limit=20):
     """Fetch global public feed with usernames."""
@@ -785,18 +1048,64 @@ def get_social_feed(limit=20):
     conn.close()
     return results
 
-def get_active_stories():
-    """Fetch current stories that haven't expired."""
+def _story_clock():
+    """Current time in the same (local) format create_story writes to expires_at."""
+    from datetime import datetime
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+def get_active_stories(page=1, authors_per_page=10, per_author=5):
+    """
+    Fetch one page of live stories grouped by author, freshest author first.
+    Returns (authors, has_more) where each author is {user_id, username, total, stories}.
+    """
+    now = _story_clock()
     conn = sqlite3.connect(DB_NAME)
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
-    c.execute('''SELECT stories.*, users.username FROM stories 
-                 JOIN users ON stories.user_id = users.id 
-                 WHERE stories.expires_at > CURRENT_TIMESTAMP 
-                 ORDER BY stories.created_at DESC''')
-    results = [dict(r) for r in c.fetchall()]
+    c.execute('''SELECT stories.user_id, users.username, MAX(stories.created_at) AS latest, COUNT(*) AS total
+                 FROM stories
+                 JOIN users ON stories.user_id = users.id
+                 WHERE stories.expires_at > ?
+                 GROUP BY stories.user_id
+                 ORDER BY latest DESC, stories.user_id
+                 LIMIT ? OFFSET ?''', (now, authors_per_page + 1, (page - 1) * authors_per_page))
+    authors = [dict(r) for r in c.fetchall()]
+    has_more = len(authors) > authors_per_page
+    authors = authors[:authors_per_page]
+
+    if authors:
+        by_id = {a['user_id']: a for a in authors}
+        for a in authors:
+            a['stories'] = []
+        placeholders = ",".join("?" * len(by_id))
+        c.execute(f'''SELECT id, user_id, content, image_url, created_at, expires_at FROM stories
+                      WHERE user_id IN ({placeholders}) AND expires_at > ?
+                      ORDER BY user_id, created_at DESC''', (*by_id, now))
+        for r in c.fetchall():
+            bucket = by_id[r['user_id']]['stories']
+            if len(bucket) < per_author:
+                bucket.append(dict(r))
     conn.close()
-    return results
+    return authors, has_more
+
+def purge_expired_stories(batch_size=500):
+    """Delete expired stories (and their reactions) in small batches. Returns rows removed."""
+    now = _story_clock()
+    removed = 0
+    conn = sqlite3.connect(DB_NAME)
+    c = conn.cursor()
+    while True:
+        c.execute("SELECT id FROM stories WHERE expires_at <= ? LIMIT ?", (now, batch_size))
+        ids = [r[0] for r in c.fetchall()]
+        if not ids:
+            break
+        placeholders = ",".join("?" * len(ids))
+        c.execute(f"DELETE FROM reactions WHERE story_id IN ({placeholders})", ids)
+        c.execute(f"DELETE FROM stories WHERE id IN ({placeholders})", ids)
+        conn.commit() # Short transactions so bot writes are never held up
+        removed += len(ids)
+    conn.close()
+    return removed
 
 def react_to_content(user_id, post_id=None, story_id=None, reaction_type='like'):
     """Add a reaction to a post or story."""
@@ -849,21 +1158,12 @@ def search_users(query, limit=10):
     return results
 
 def get_mutual_friends_count(user1_id, user2_id):
-    """Calculate the number of mutual friends between two users."""
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute('''SELECT COUNT(*) FROM (
-                    SELECT user2_id as friend_id FROM friends WHERE user1_id = ? AND status = 'accepted'
-                    UNION SELECT user1_id FROM friends WHERE user2_id = ? AND status = 'accepted'
-                 ) AS u1
-                 INTERSECT
-                 SELECT friend_id FROM (
-                    SELECT user2_id as friend_id FROM friends WHERE user1_id = ? AND status = 'accepted'
-                    UNION SELECT user1_id FROM friends WHERE user2_id = ? AND status = 'accepted'
-                 ) AS u2''', (user1_id, user1_id, user2_id, user2_id))
-    count = c.fetchone()[0]
-    conn.close()
-    return count
+    """Calculate the number of mutual friends between two users (set intersection in memory)."""
+    return social_graph.mutual_friends_count(user1_id, user2_id)
+
+def are_friends(user1_id, user2_id):
+    """O(1) friendship check backed by the social graph."""
+    return social_graph.are_friends(user1_id, user2_id)
 
 def follow_user(follower_id, followed_username):
     """Follow a user by their username."""
@@ -882,7 +1182,9 @@ def follow_user(follower_id, followed_username):
         
     try:
         c.execute("INSERT INTO follows (follower_id, followed_id) VALUES (?, ?)", (follower_id, followed_id))
+        version = bump_graph_version(c)
         conn.commit()
+        social_graph.add_follow(follower_id, followed_id, version)
         res = True, f"You are now following {followed_username}!"
     except sqlite3.IntegrityError:
         res = False, f"You are already following {followed_username}."
@@ -901,8 +1203,10 @@ def unfollow_user(follower_id, followed_username):
         return False, "User not found."
     
     c.execute("DELETE FROM follows WHERE follower_id = ? AND followed_id = ?", (follower_id, followed[0]))
+    version = bump_graph_version(c)
     conn.commit()
     conn.close()
+    social_graph.remove_follow(follower_id, followed[0], version)
     return True, f"Unfollowed {followed_username}."
 
 def get_follow_status(follower_id, followed_id):
@@ -961,3 +1265,45 @@ def update_post_visibility(post_id, user_id, visibility):
     conn.commit()
     conn.close()
     return True
+
+def get_friend_suggestions(user_id, limit=5):
+    """Read precomputed 'People you may know' candidates, best first."""
+    conn = sqlite3.connect(DB_NAME)
+    c = conn.cursor()
+    c.execute('''SELECT friend_suggestions.candidate_id, users.username, friend_suggestions.score
+                 FROM friend_suggestions
+                 JOIN users ON friend_suggestions.candidate_id = users.id
+                 WHERE friend_suggestions.user_id = ?
+                 ORDER BY friend_suggestions.score DESC, friend_suggestions.candidate_id ASC
+                 LIMIT ?''', (user_id, limit))
+    rows = c.fetchall()
+    conn.close()
+    return [{"id": r[0], "username": r[1], "mutuals": r[2]} for r in rows]
+
+def store_friend_suggestions(suggestions, replace_all=False):
+    """Replace stored suggestions for every user in {user_id: [(candidate_id, score), ...]}."""
+    conn = sqlite3.connect(DB_NAME)
+    c = conn.cursor()
+    if replace_all:
+        c.execute("DELETE FROM friend_suggestions")
+    else:
+        c.executemany("DELETE FROM friend_suggestions WHERE user_id = ?", [(u,) for u in suggestions])
+    rows = [(u, cand, score) for u, cands in suggestions.items() for cand, score in cands]
+    c.executemany("INSERT INTO friend_suggestions (user_id, candidate_id, score) VALUES (?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+def pop_dirty_suggestion_users():
+    """Atomically drain the set of users whose suggestions are out of date."""
+    conn = sqlite3.connect(DB_NAME)
+    c = conn.cursor()
+    c.execute("BEGIN IMMEDIATE")
+    c.execute("SELECT user_id FROM suggestion_dirty")
+    ids = [r[0] for r in c.fetchall()]
+    c.execute("DELETE FROM suggestion_dirty")
+    conn.commit()
+    conn.close()
+    return ids
+
+# Per-query latency (`db.<function>`) when METRICS_ENABLED; must run before other modules import names
+metrics.instrument_module(sys.modules[__name__], prefix="db.")
@@ -0,0 +1,70 @@
+import threading
+import time
+from collections import OrderedDict
+from app.core.config import DEDUP_TTL_SECONDS, DEDUP_MEMORY_SIZE
+from app.core.database import claim_event, purge_processed_events
+from app.core.metrics import metrics
+
+class DedupStore:
+    """
+    Drops inbound messages the platform delivers twice (reconnects, supervisor restarts).
+    Recent ids live in a bounded in-memory ring; `processed_events` makes the check
+    survive a restart and is swept of ids older than the TTL.
+    """
+
+    SWEEP_INTERVAL = 300 # seconds between opportunistic TTL sweeps
+
+    def __init__(self, ttl=DEDUP_TTL_SECONDS, capacity=DEDUP_MEMORY_SIZE):
+        self.ttl = ttl
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._recent = OrderedDict() # event_key -> first seen (monotonic)
+        self._last_sweep = time.monotonic()
+        self.dropped = 0
+
+    def _remember(self, key, now):
+        with self._lock:
+            self._recent[key] = now
+            self._recent.move_to_end(key)
+            while len(self._recent) > self.capacity:
+                self._recent.popitem(last=False)
+
+    def is_duplicate(self, platform, message_id):
+        """True when this platform message id was already handled; the first call for an id claims it."""
+        if not message_id:
+            return False # Nothing to key on, let it through
+        key = f"{platform}:{message_id}"
+        now = time.monotonic()
+        if now - self._last_sweep > self.SWEEP_INTERVAL:
+            self.sweep()
+
+        with self._lock:
+            seen_at = self._recent.get(key)
+        if seen_at is not None and now - seen_at <= self.ttl:
+            return self._drop(platform, key)
+
+        try:
+            claimed = claim_event(key)
+        except Exception as e:
+            print(f"⚠️ Dedup store unavailable, processing {key} anyway: {e}")
+            return False
+        self._remember(key, now)
+        return False if claimed else self._drop(platform, key)
+
+    def _drop(self, platform, key):
+        self.dropped += 1
+        metrics.incr(f"dedup.{platform}.dropped")
+        print(f"♻️ Dropped redelivered message {key}")
+        return True
+
+    def sweep(self):
+        self._last_sweep = now = time.monotonic()
+        with self._lock:
+            while self._recent and now - next(iter(self._recent.values())) > self.ttl:
+                self._recent.popitem(last=False)
+        try:
+            purge_processed_events(self.ttl)
+        except Exception as e:
+            print(f"⚠️ Could not sweep processed events: {e}")
+
+dedup_store = DedupStore()
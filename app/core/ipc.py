@@ -0,0 +1,70 @@
+import multiprocessing
+import queue
+import time
+from app.core.config import IPC_LANE_WEIGHTS
+from app.core.metrics import metrics
+
+# Payload kind (see tracing.stamp) -> lane; anything unlisted is interactive
+LANE_BY_KIND = {
+    "otp": "critical",
+    "broadcast": "bulk",
+    "notify": "bulk",
+}
+LANES = ("critical", "interactive", "bulk")
+
+class OutboundQueue:
+    """
+    Drop-in replacement for the per-platform multiprocessing.Queue.
+    Producers `put()` payloads as before; each goes to a lane chosen from its kind.
+    The platform listener's `get()` drains the lanes with smooth weighted round-robin,
+    so a large broadcast can only take a small share of sends while OTPs and
+    replies are waiting. Time spent queued is recorded per lane.
+    """
+
+    RACE_RETRY_SECONDS = 0.001
+
+    def __init__(self, name, weights=None):
+        self.name = name
+        self.weights = dict(weights or IPC_LANE_WEIGHTS)
+        self.lanes = {lane: multiprocessing.Queue() for lane in LANES}
+        self._available = multiprocessing.Semaphore(0) # One permit per queued payload, across lanes
+        self._current = {lane: 0 for lane in LANES}    # Consumer-side round-robin state
+
+    def put(self, item):
+        lane = LANE_BY_KIND.get(item.get("kind"), "interactive") if isinstance(item, dict) else "interactive"
+        self.lanes[lane].put(item)
+        self._available.release()
+
+    def _order(self):
+        """Lanes to try, best weighted-round-robin candidate first."""
+        total = 0
+        for lane in LANES:
+            self._current[lane] += self.weights[lane]
+            total += self.weights[lane]
+        order = sorted(LANES, key=lambda l: -self._current[l])
+        return order, total
+
+    def get(self, block=True, timeout=None):
+        if not self._available.acquire(block, timeout):
+            raise queue.Empty
+        while True:
+            order, total = self._order()
+            for lane in order:
+                try:
+                    item = self.lanes[lane].get_nowait()
+                except queue.Empty:
+                    self._current[lane] = 0 # An idle lane does not bank credit for later bursts
+                    continue
+                self._current[lane] -= total
+                self._record_wait(lane, item)
+                return item
+            # Permit seen before the producer's feeder thread flushed the item; it is moments away
+            time.sleep(self.RACE_RETRY_SECONDS)
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def _record_wait(self, lane, item):
+        enqueued_at = item.get("enqueued_at") if isinstance(item, dict) else None
+        if enqueued_at is not None:
+            metrics.observe(f"ipc.{self.name}.lane.{lane}", max(0.0, time.time() - enqueued_at) * 1000.0)
@@ -0,0 +1,183 @@
+import json
+import math
+import threading
+import time
+from app.core.config import METRICS_ENABLED
+
+class Histogram:
+    """Fixed-memory latency histogram (milliseconds) with log-spaced buckets (~10% resolution)."""
+
+    MIN_MS = 0.01
+    GROWTH = 1.1
+    BUCKETS = 200 # covers 0.01 ms .. ~30 minutes
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, ms):
+        idx = 0 if ms <= self.MIN_MS else min(int(math.log(ms / self.MIN_MS, self.GROWTH)) + 1, self.BUCKETS - 1)
+        self.counts[idx] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, p):
+        if not self.count:
+            return 0.0
+        rank = p / 100.0 * self.count
+        seen = 0
+        for idx, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                # Upper edge of the bucket, capped by the true max
+                return min(self.MIN_MS * self.GROWTH ** idx, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50), 3),
+            "p95_ms": round(self.percentile(95), 3),
+            "p99_ms": round(self.percentile(99), 3),
+            "max_ms": round(self.max, 3),
+        }
+
+class _NullSpan:
+    """Shared no-op span returned while metrics are disabled."""
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ("registry", "name", "start")
+
+    def __init__(self, registry, name):
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.name, (time.perf_counter() - self.start) * 1000.0)
+        return False
+
+class Metrics:
+    """
+    In-process latency histograms and counters.
+    When disabled, `span()` hands back a shared no-op object and nothing is recorded.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self.started_at = time.time()
+
+    def span(self, name):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def observe(self, name, ms):
+        if not self.enabled:
+            return
+        with self._lock:
+            hist = self._histograms.get(name)
+            if hist is None:
+                hist = self._histograms[name] = Histogram()
+            hist.record(ms)
+
+    def incr(self, name, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def instrument_module(self, module, prefix):
+        """Wrap every public function of `module` in a span named `<prefix><function>` (no-op when disabled)."""
+        if not self.enabled:
+            return
+        import types
+        for name, fn in list(vars(module).items()):
+            if name.startswith("_") or not isinstance(fn, types.FunctionType) or fn.__module__ != module.__name__:
+                continue
+            setattr(module, name, self._timed(prefix + name, fn))
+
+    def _timed(self, label, fn):
+        import functools
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.observe(label, (time.perf_counter() - start) * 1000.0)
+        return wrapper
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "uptime_s": round(time.time() - self.started_at, 1),
+                "histograms": {name: h.summary() for name, h in sorted(self._histograms.items())},
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    def render_text(self, prefix=None, limit=None):
+        """Human-readable report, slowest p95 first."""
+        snap = self.snapshot()
+        rows = [(n, s) for n, s in snap["histograms"].items() if not prefix or n.startswith(prefix)]
+        rows.sort(key=lambda r: r[1]["p95_ms"], reverse=True)
+        if limit:
+            rows = rows[:limit]
+        lines = [f"{'stage':<32} {'n':>7} {'p50':>9} {'p95':>9} {'p99':>9}"]
+        for name, s in rows:
+            lines.append(f"{name:<32} {s['count']:>7} {s['p50_ms']:>9.2f} {s['p95_ms']:>9.2f} {s['p99_ms']:>9.2f}")
+        for name, value in snap["counters"].items():
+            if not prefix or name.startswith(prefix):
+                lines.append(f"{name:<32} {value:>7}")
+        return "\n".join(lines)
+
+    def start_http_server(self, port, host="127.0.0.1"):
+        """Serve `/metrics` (text) and `/metrics.json` on a local port from a daemon thread."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer # Only needed when serving
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics.json":
+                    body, ctype = json.dumps(registry.snapshot()).encode(), "application/json"
+                elif self.path == "/metrics":
+                    body, ctype = registry.render_text().encode(), "text/plain; charset=utf-8"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass # Keep the console clean
+
+        try:
+            server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            print(f"⚠️ Metrics endpoint not started on {host}:{port}: {e}")
+            return None
+        threading.Thread(target=server.serve_forever, name="MetricsHTTP", daemon=True).start()
+        print(f"📈 Metrics endpoint: http://{host}:{port}/metrics")
+        return server
+
+metrics = Metrics(enabled=METRICS_ENABLED)
@@ -0,0 +1,75 @@
+from collections import deque
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over groups of keywords ({label: [keyword, ...]}).
+    Built once; a scan costs one pass over the text no matter how many keywords
+    there are, and reports every keyword occurring as a substring (overlaps included),
+    i.e. the same answer as `keyword in text` for each (distinct) keyword.
+    Matching is case-sensitive: callers lower-case both sides.
+    """
+
+    def __init__(self, groups):
+        self._goto = [{}]   # state -> {char: next state}
+        self._fail = [0]
+        self._out = [()]    # state -> ((label, keyword), ...) ending here, incl. via fail links
+        self.size = 0
+        for label, keywords in groups.items():
+            for keyword in keywords:
+                self._add(label, keyword)
+        self._link()
+
+    def _add(self, label, keyword):
+        if not keyword:
+            return
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        self._out[state] += ((label, keyword),)
+        self.size += 1
+
+    def _link(self):
+        """Breadth-first failure links; outputs of the fail target are merged in."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] += self._out[self._fail[nxt]]
+
+    def matches(self, text):
+        """{label: {keyword, ...}} for every keyword found in `text`."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found = {}
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for label, keyword in out[state]:
+                found.setdefault(label, set()).add(keyword)
+        return found
+
+    def contains_any(self, text):
+        """True as soon as any keyword occurs in `text`."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                return True
+        return False
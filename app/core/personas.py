@@ -0,0 +1,58 @@
+import threading
+
+# Built-in personas: (id, name, prompt). Ids match the registration menu and never change.
+BUILTIN_PERSONAS = (
+    (1, "best_friend", "You are a supportive, enthusiastic best friend. You use emojis, give compliments, and encourage the user with a warm, caring vibe."),
+    (2, "roast_master", "You are a sarcastic roast master. You make fun of the user playfully, you are witty, sassy, and never hold back on the humor."),
+    (3, "professional", "You are a professional, highly efficient executive assistant. You are polite, concise, formal, and focused on excellence."),
+    (4, "wizard", "You are a mystical wizard. You speak in riddles, use archaic language, and reference ancient magic and hidden wisdom."),
+)
+DEFAULT_PERSONA_ID = 1
+
+class PersonaRegistry:
+    """
+    Shared persona texts keyed by `personas.id`.
+    Built-ins come from code; other rows of the `personas` table are loaded once on
+    first use (and again only when an unknown id shows up). Users reference a persona
+    by id, so resolving one costs a dict lookup instead of a Fernet decrypt.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_id = {pid: prompt for pid, _, prompt in BUILTIN_PERSONAS}
+        self._by_prompt = {prompt: pid for pid, _, prompt in BUILTIN_PERSONAS}
+        self._loaded = False
+
+    def _load(self):
+        from app.core.database import get_personas
+        rows = get_personas()
+        with self._lock:
+            for pid, _name, prompt in rows:
+                self._by_id[pid] = prompt
+                self._by_prompt.setdefault(prompt, pid)
+            self._loaded = True
+
+    def get(self, persona_id):
+        """Prompt text for a persona id (None if unknown)."""
+        if persona_id is None:
+            return None
+        prompt = self._by_id.get(persona_id)
+        if prompt is None:
+            self._load()
+            prompt = self._by_id.get(persona_id)
+        return prompt
+
+    def id_for(self, prompt):
+        """Id of the shared persona with exactly this text, or None for a truly custom prompt."""
+        if not prompt:
+            return None
+        if prompt not in self._by_prompt and not self._loaded:
+            self._load()
+        return self._by_prompt.get(prompt)
+
+    def add(self, persona_id, prompt):
+        with self._lock:
+            self._by_id[persona_id] = prompt
+            self._by_prompt.setdefault(prompt, persona_id)
+
+persona_registry = PersonaRegistry()
@@ -1,4 +1,3 @@
-import qrcode
 import os
 import uuid
 from app.core.config import DATA_DIR
@@ -28,7 +27,8 @@ class QRHandler:
         filename = f"{prefix}{uuid.uuid4().hex[:8]}.png"
         filepath = os.path.join(self.qr_dir, filename)
 
-        # Generate QR
+        # Generate QR (qrcode + PIL are only imported when a QR is actually requested)
+        import qrcode
         qr = qrcode.QRCode(
             version=1,
             error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -0,0 +1,90 @@
+import threading
+import time
+from app.core.config import RATE_LIMITS, LLM_GLOBAL_PER_MINUTE, LLM_GLOBAL_BURST, LLM_BUDGET_PROCESSES
+from app.core.metrics import metrics
+
+# Command -> rate class; other slash commands are "command", free text is "chat"
+COMMAND_CLASSES = {
+    "/login": "auth", "/otp_login": "auth", "/verify": "auth", "/register": "auth", "/start": "auth",
+    "/imagine": "heavy", "/caption": "heavy", "/broadcast": "heavy",
+}
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, per_minute, burst, now):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def take(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+    def full_at(self, now):
+        return self.tokens + (now - self.updated) * self.rate >= self.burst
+
+class RateLimiter:
+    """
+    Token buckets per (platform id, rate class), checked before UnifiedBot does any DB
+    or LLM work, plus a bucket for LLM calls holding this process's share of the global
+    LLM budget. A limited sender is told once to slow down and then ignored until their
+    bucket refills.
+    """
+
+    SWEEP_INTERVAL = 300 # seconds between dropping refilled (idle) buckets
+
+    def __init__(self, limits=RATE_LIMITS, llm_per_minute=LLM_GLOBAL_PER_MINUTE / LLM_BUDGET_PROCESSES,
+                 llm_burst=max(1, LLM_GLOBAL_BURST // LLM_BUDGET_PROCESSES)):
+        self.limits = limits
+        self._lock = threading.Lock()
+        self._buckets = {} # (platform, platform id, rate class) -> TokenBucket
+        self._warned = set()
+        self._llm = TokenBucket(llm_per_minute, llm_burst, time.monotonic())
+        self._last_sweep = time.monotonic()
+
+    def classify(self, message):
+        word = message.strip().split(maxsplit=1)[0].lower() if message and message.strip() else ""
+        if not word.startswith("/"):
+            return "chat"
+        return COMMAND_CLASSES.get(word, "command")
+
+    def check(self, platform, platform_id, message):
+        """(allowed, warn): `warn` is True only for the first rejected message of a streak."""
+        cls = self.classify(message)
+        key = (platform, str(platform_id), cls)
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sweep > self.SWEEP_INTERVAL:
+                self._sweep(now)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                per_minute, burst = self.limits[cls]
+                bucket = self._buckets[key] = TokenBucket(per_minute, burst, now)
+            if bucket.take(now):
+                self._warned.discard(key)
+                return True, False
+            warn = key not in self._warned
+            self._warned.add(key)
+        metrics.incr(f"ratelimit.{cls}.rejected")
+        return False, warn
+
+    def acquire_llm(self):
+        """False when this process's share of the LLM budget is spent (caller should answer locally)."""
+        with self._lock:
+            allowed = self._llm.take(time.monotonic())
+        if not allowed:
+            metrics.incr("ratelimit.llm.shed")
+        return allowed
+
+    def _sweep(self, now):
+        self._last_sweep = now
+        idle = [key for key, bucket in self._buckets.items() if bucket.full_at(now)]
+        for key in idle:
+            del self._buckets[key]
+            self._warned.discard(key)
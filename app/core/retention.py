@@ -0,0 +1,119 @@
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from app.core.config import DB_NAME, CONVERSATION_RETENTION_DAYS, CONVERSATION_HOT_TURNS
+from app.core.security import security_manager
+
+class RetentionManager:
+    """
+    Keeps the hot `conversations` table small.
+    Turns older than the retention window (beyond each user's newest
+    CONVERSATION_HOT_TURNS) are packed per user into zlib-compressed,
+    Fernet-encrypted blocks in `conversation_archive`, which get_chat_history reads
+    back when the hot turns don't fill a history request. Freed pages are returned
+    with incremental VACUUM and the WAL is checkpointed after each run.
+    """
+
+    BLOCK_TURNS = 500     # Turns per archive block
+    VACUUM_PAGES = 2000   # Pages released per incremental_vacuum step
+
+    def __init__(self, retention_days=CONVERSATION_RETENTION_DAYS, hot_turns=CONVERSATION_HOT_TURNS):
+        self.retention_days = retention_days
+        self.hot_turns = hot_turns
+        self.running = False
+
+    def _connect(self):
+        conn = sqlite3.connect(DB_NAME)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        return conn
+
+    def ensure_incremental_vacuum(self):
+        """
+        One-time conversion of databases created before auto_vacuum was enabled.
+        The full VACUUM locks the whole database while it rewrites it, so this only runs
+        from main.py before any bot process starts, never from the scheduler.
+        """
+        conn = self._connect()
+        try:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                print("🗜️ Enabling incremental auto-vacuum (one-time VACUUM)...")
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+        finally:
+            conn.close()
+
+    def archive_old_turns(self):
+        """Move cold turns into archive blocks. Returns the number of turns archived."""
+        cutoff = f"-{int(self.retention_days)} days"
+        conn = self._connect()
+        c = conn.cursor()
+        archived = 0
+        try:
+            c.execute('''SELECT user_id FROM conversations
+                         GROUP BY user_id
+                         HAVING MIN(timestamp) < datetime('now', ?) AND COUNT(*) > ?''', (cutoff, self.hot_turns))
+            user_ids = [r[0] for r in c.fetchall()]
+            for user_id in user_ids:
+                archived += self._archive_user(c, conn, user_id, cutoff)
+        finally:
+            conn.close()
+        return archived
+
+    def _archive_user(self, c, conn, user_id, cutoff):
+        archived = 0
+        while True:
+            c.execute('''SELECT id, message, response, timestamp FROM conversations
+                         WHERE user_id = ? AND timestamp < datetime('now', ?)
+                           AND id NOT IN (SELECT id FROM conversations WHERE user_id = ?
+                                          ORDER BY timestamp DESC, id DESC LIMIT ?)
+                         ORDER BY timestamp, id LIMIT ?''',
+                      (user_id, cutoff, user_id, self.hot_turns, self.BLOCK_TURNS))
+            rows = c.fetchall()
+            if not rows:
+                return archived
+
+            # Compress plaintext, then encrypt the whole block (ciphertext doesn't compress)
+            turns = [[ts, security_manager.decrypt(msg), security_manager.decrypt(res)] for _, msg, res, ts in rows]
+            payload = security_manager.encrypt_bytes(zlib.compress(json.dumps(turns).encode("utf-8"), 6))
+            c.execute('''INSERT INTO conversation_archive (user_id, first_ts, last_ts, turn_count, payload)
+                         VALUES (?, ?, ?, ?, ?)''', (user_id, rows[0][3], rows[-1][3], len(rows), payload))
+            placeholders = ",".join("?" * len(rows))
+            c.execute(f"DELETE FROM conversations WHERE id IN ({placeholders})", [r[0] for r in rows])
+            conn.commit() # One block per transaction
+            archived += len(rows)
+
+    def compact(self):
+        """Release free pages and truncate the WAL."""
+        conn = self._connect()
+        try:
+            conn.execute(f"PRAGMA incremental_vacuum({self.VACUUM_PAGES})").fetchall()
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        finally:
+            conn.close()
+
+    def run_once(self):
+        archived = self.archive_old_turns()
+        self.compact()
+        return archived
+
+    def start_scheduler(self, interval=3600):
+        self.running = True
+        thread = threading.Thread(target=self._run_loop, args=(interval,))
+        thread.daemon = True
+        thread.start()
+        print("🗄️ Conversation Retention Started.")
+
+    def _run_loop(self, interval):
+        while self.running:
+            try:
+                archived = self.run_once()
+                if archived:
+                    print(f"🗄️ Archived {archived} old conversation turns.")
+            except Exception as e:
+                print(f"❌ Error in retention run: {e}")
+            time.sleep(interval)
+
+    def stop(self):
+        self.running = False
@@ -1,6 +1,13 @@
 import os
+import zlib
 from cryptography.fernet import Fernet
 from dotenv import load_dotenv
+from app.core.metrics import metrics
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None # zstd is optional; zlib is always available
 
 load_dotenv()
 
@@ -20,8 +27,25 @@ if not ENCRYPTION_KEY:
     # But to be safe, we'll use the one from .env or a deterministic one for this local env.
     pass
 
+# Every payload written inside a Fernet token starts with FORMAT_MARKER and a codec byte.
+# 0xFF never occurs in UTF-8, so tokens without it are legacy rows holding raw text.
+FORMAT_MARKER = b"\xff"
+CODEC_RAW = b"r"
+CODEC_ZLIB = b"z"
+CODEC_ZSTD = b"s"
+_INTERIM_MARKER = b"\x00" # Compressed rows from before the format byte: NUL + codec, tried before falling back to raw
+
 class SecurityManager:
-    def __init__(self):
+    def __init__(self, compression=None, min_compress_bytes=None):
+        # Optional compression before encryption: "off" (default), "zlib" or "zstd"
+        self.compression = (compression or os.getenv("ENCRYPTION_COMPRESSION", "off")).lower()
+        if self.compression == "zstd" and zstandard is None:
+            print("⚠️ zstandard not installed, falling back to zlib compression.")
+            self.compression = "zlib"
+        self.min_compress_bytes = min_compress_bytes if min_compress_bytes is not None else int(os.getenv("ENCRYPTION_COMPRESS_MIN_BYTES", "256"))
+        self._zstd_c = zstandard.ZstdCompressor(level=3) if zstandard else None
+        self._zstd_d = zstandard.ZstdDecompressor() if zstandard else None
+
         # Strict key requirement: Must be a 32-byte URL-safe base64 string
         key = os.getenv("ENCRYPTION_KEY")
         if not key:
@@ -38,14 +62,55 @@ class SecurityManager:
     def encrypt(self, data: str) -> str:
         if not data: return ""
         if not isinstance(data, str): data = str(data)
-        return self.fernet.encrypt(data.encode()).decode()
+        with metrics.span("crypto.encrypt"):
+            return self.fernet.encrypt(self._pack(data.encode())).decode()
+
+    def _pack(self, raw: bytes) -> bytes:
+        """Format byte + payload; long payloads are compressed when it actually saves space."""
+        stored = FORMAT_MARKER + CODEC_RAW + raw
+        if self.compression == "off" or len(raw) < self.min_compress_bytes:
+            return stored
+        if self.compression == "zstd":
+            packed = FORMAT_MARKER + CODEC_ZSTD + self._zstd_c.compress(raw)
+        else:
+            packed = FORMAT_MARKER + CODEC_ZLIB + zlib.compress(raw, 6)
+        return packed if len(packed) < len(stored) else stored
+
+    def _unpack(self, payload: bytes) -> bytes:
+        if payload.startswith(FORMAT_MARKER):
+            return self._decompress(payload[1:2], payload[2:])
+        if payload[:1] == _INTERIM_MARKER and payload[1:2] in (CODEC_ZLIB, CODEC_ZSTD):
+            try:
+                return self._decompress(payload[1:2], payload[2:])
+            except Exception:
+                pass # Plaintext that happens to start with NUL
+        return payload # Legacy: raw text
+
+    def _decompress(self, codec, body):
+        if codec == CODEC_RAW:
+            return body
+        if codec == CODEC_ZLIB:
+            return zlib.decompress(body)
+        if codec == CODEC_ZSTD:
+            if self._zstd_d is None:
+                raise ValueError("zstd-compressed data but zstandard is not installed")
+            return self._zstd_d.decompress(body)
+        raise ValueError(f"Unknown compression codec: {codec!r}")
+
+    def encrypt_bytes(self, data: bytes) -> bytes:
+        """Encrypt a binary blob (e.g. a compressed archive block)."""
+        return self.fernet.encrypt(data)
+
+    def decrypt_bytes(self, token: bytes) -> bytes:
+        return self.fernet.decrypt(token)
 
     def decrypt(self, encrypted_data: str) -> str:
         if not encrypted_data: return ""
         try:
             # Check if it looks like a Fernet token (usually starts with gAAAA)
             if isinstance(encrypted_data, str) and encrypted_data.startswith("gAAAA"):
-                return self.fernet.decrypt(encrypted_data.encode()).decode()
+                with metrics.span("crypto.decrypt"):
+                    return self._unpack(self.fernet.decrypt(encrypted_data.encode())).decode()
             return encrypted_data # Likely already plaintext
         except Exception:
             # Decryption failed - return as is if it might be legacy plaintext
@@ -0,0 +1,54 @@
+import atexit
+import multiprocessing.util
+import signal
+import sys
+import threading
+
+_hooks = []
+_lock = threading.Lock()
+_ran = False
+_installed = False
+
+def on_shutdown(fn):
+    """Run `fn` once when this process shuts down. Hooks run newest first, the conversation log last."""
+    with _lock:
+        _hooks.append(fn)
+    return fn
+
+def run_shutdown_hooks():
+    """Idempotent: called from `finally` blocks, the signal path and interpreter exit alike."""
+    global _ran
+    with _lock:
+        if _ran:
+            return
+        _ran = True
+        hooks = list(reversed(_hooks))
+    for fn in hooks:
+        try:
+            fn()
+        except Exception as e:
+            print(f"⚠️ Shutdown hook {getattr(fn, '__qualname__', fn)} failed: {e}")
+
+def _close_conversation_log():
+    from app.core.conversation_logger import conversation_logger
+    conversation_logger.close()
+
+def _exit_on_signal(signum, frame):
+    print(f"🔴 Signal {signum} received, shutting down...")
+    sys.exit(0) # SystemExit unwinds through the run loop's finally and multiprocessing's finalizers
+
+def install_shutdown_hook():
+    """
+    Call once from the main thread of every supervised process (bots, workers).
+    SIGTERM (supervisor restart) and SIGINT exit through SystemExit, and the hooks run
+    from multiprocessing.util.Finalize: plain atexit never fires in a multiprocessing child.
+    """
+    global _installed
+    if _installed:
+        return
+    _installed = True
+    on_shutdown(_close_conversation_log) # Registered first, so it runs after hooks that still log
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(sig, _exit_on_signal)
+    multiprocessing.util.Finalize(None, run_shutdown_hooks, exitpriority=20) # Before the logger's own finalizer
+    atexit.register(run_shutdown_hooks) # Standalone runs (python -m app.bots...)
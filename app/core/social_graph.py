@@ -0,0 +1,182 @@
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from app.core.config import DB_NAME
+
+class SocialGraph:
+    """
+    In-memory adjacency sets for friendships, follows and blocks.
+    Loaded once from the database and kept current by the write functions in
+    `app.core.database`, so permission checks and mutual counts never hit SQLite.
+    """
+
+    # How often (seconds) we check whether another process changed the graph
+    SYNC_INTERVAL = 5.0
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._friends = defaultdict(set)    # user_id -> accepted friend ids
+        self._followers = defaultdict(set)  # user_id -> ids following them
+        self._following = defaultdict(set)  # user_id -> ids they follow
+        self._blocked = defaultdict(set)    # user_id -> ids they have blocked
+        self.version = None
+        self._stale = True
+        self._last_sync = 0.0
+
+    def load(self):
+        """(Re)build all adjacency sets from the database."""
+        conn = sqlite3.connect(DB_NAME)
+        c = conn.cursor()
+        try:
+            # Single read transaction so the snapshot and version agree
+            c.execute("BEGIN")
+            c.execute("SELECT value FROM system_meta WHERE key = 'social_graph_version'")
+            row = c.fetchone()
+            version = row[0] if row else 0
+            c.execute("SELECT user1_id, user2_id FROM friends WHERE status = 'accepted'")
+            friend_rows = c.fetchall()
+            c.execute("SELECT follower_id, followed_id FROM follows")
+            follow_rows = c.fetchall()
+            c.execute("SELECT user_id, blocked_user_id FROM blocked_users")
+            block_rows = c.fetchall()
+            c.execute("COMMIT")
+        finally:
+            conn.close()
+
+        friends, followers, following, blocked = defaultdict(set), defaultdict(set), defaultdict(set), defaultdict(set)
+        for a, b in friend_rows:
+            friends[a].add(b)
+            friends[b].add(a)
+        for follower_id, followed_id in follow_rows:
+            followers[followed_id].add(follower_id)
+            following[follower_id].add(followed_id)
+        for user_id, blocked_id in block_rows:
+            blocked[user_id].add(blocked_id)
+
+        with self._lock:
+            self._friends, self._followers, self._following, self._blocked = friends, followers, following, blocked
+            self.version = version
+            self._stale = False
+            self._last_sync = time.monotonic()
+
+    def _ensure_fresh(self, force=False):
+        """Reload if a local write raced another process, or if the shared version moved on."""
+        if self._stale:
+            self.load()
+            return
+        now = time.monotonic()
+        if not force and now - self._last_sync < self.SYNC_INTERVAL:
+            return
+        conn = sqlite3.connect(DB_NAME)
+        try:
+            row = conn.execute("SELECT value FROM system_meta WHERE key = 'social_graph_version'").fetchone()
+        finally:
+            conn.close()
+        self._last_sync = now
+        if (row[0] if row else 0) != self.version:
+            self.load()
+
+    def _applied(self, new_version):
+        """Track the shared version after a local incremental update."""
+        if self.version is not None and new_version == self.version + 1:
+            self.version = new_version
+        else:
+            # Someone else wrote in between; we can't trust our increment alone
+            self._stale = True
+
+    # --- Reads ---
+
+    def are_friends(self, user_id, other_id):
+        with self._lock:
+            self._ensure_fresh()
+            return other_id in self._friends.get(user_id, ())
+
+    def friend_ids(self, user_id):
+        with self._lock:
+            self._ensure_fresh()
+            return set(self._friends.get(user_id, ()))
+
+    def mutual_friends_count(self, user1_id, user2_id):
+        with self._lock:
+            self._ensure_fresh()
+            a = self._friends.get(user1_id, set())
+            b = self._friends.get(user2_id, set())
+            # Intersect from the smaller side
+            if len(a) > len(b):
+                a, b = b, a
+            return sum(1 for f in a if f in b)
+
+    def has_blocked(self, user_id, target_id):
+        """True if `user_id` has blocked `target_id`."""
+        with self._lock:
+            self._ensure_fresh()
+            return target_id in self._blocked.get(user_id, ())
+
+    def is_following(self, follower_id, followed_id):
+        with self._lock:
+            self._ensure_fresh()
+            return followed_id in self._following.get(follower_id, ())
+
+    def follower_ids(self, user_id):
+        with self._lock:
+            self._ensure_fresh()
+            return set(self._followers.get(user_id, ()))
+
+    def current_version(self):
+        """Shared graph version (after any pending sync); changes on every friend/follow/block write."""
+        with self._lock:
+            self._ensure_fresh()
+            return self.version
+
+    def snapshot(self):
+        """Return fresh copies of (friends, blocked) adjacency for batch jobs."""
+        with self._lock:
+            self._ensure_fresh(force=True)
+            friends = {u: set(f) for u, f in self._friends.items() if f}
+            blocked = {u: set(b) for u, b in self._blocked.items() if b}
+            return friends, blocked
+
+    # --- Incremental updates (called by database.py after commit) ---
+
+    def add_friendship(self, user1_id, user2_id, version):
+        with self._lock:
+            self._friends[user1_id].add(user2_id)
+            self._friends[user2_id].add(user1_id)
+            self._applied(version)
+
+    def remove_friendship(self, user1_id, user2_id, version):
+        with self._lock:
+            self._friends[user1_id].discard(user2_id)
+            self._friends[user2_id].discard(user1_id)
+            self._applied(version)
+
+    def add_follow(self, follower_id, followed_id, version):
+        with self._lock:
+            self._followers[followed_id].add(follower_id)
+            self._following[follower_id].add(followed_id)
+            self._applied(version)
+
+    def remove_follow(self, follower_id, followed_id, version):
+        with self._lock:
+            self._followers[followed_id].discard(follower_id)
+            self._following[follower_id].discard(followed_id)
+            self._applied(version)
+
+    def add_block(self, user_id, blocked_id, version):
+        with self._lock:
+            self._blocked[user_id].add(blocked_id)
+            self._applied(version)
+
+    def remove_block(self, user_id, blocked_id, version):
+        with self._lock:
+            self._blocked[user_id].discard(blocked_id)
+            self._applied(version)
+
+def bump_graph_version(cursor):
+    """Increment the shared graph version inside the caller's transaction and return it."""
+    cursor.execute("UPDATE system_meta SET value = value + 1 WHERE key = 'social_graph_version'")
+    cursor.execute("SELECT value FROM system_meta WHERE key = 'social_graph_version'")
+    return cursor.fetchone()[0]
+
+social_graph = SocialGraph()
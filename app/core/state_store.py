@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict
+from app.core.config import STATE_TTL_SECONDS, STATE_NEGATIVE_CACHE_SIZE
+from app.core.database import set_state, get_state, clear_state, purge_stale_states
+
+class StateStore:
+    """
+    In-process conversation state (registration / OTP flows).
+    Each platform id is only ever handled by one bot process, so the in-memory
+    map is authoritative; `user_states` is written through for durability and
+    read at most once per id. A negative cache remembers ids with no flow, so
+    ordinary messages never touch SQLite here.
+    """
+
+    SWEEP_INTERVAL = 60 # seconds between opportunistic TTL sweeps
+
+    def __init__(self, ttl=STATE_TTL_SECONDS, negative_cache_size=STATE_NEGATIVE_CACHE_SIZE):
+        self.ttl = ttl
+        self.negative_cache_size = negative_cache_size
+        self._lock = threading.Lock()
+        self._states = {}    # platform_id -> (state, data, touched_at)
+        self._absent = OrderedDict() # platform_ids known to have no state (LRU, bounded)
+        self._last_sweep = time.monotonic()
+
+    def get(self, platform_id):
+        """Return (state, data) just like `database.get_state`."""
+        now = time.monotonic()
+        if now - self._last_sweep > self.SWEEP_INTERVAL:
+            self.sweep()
+
+        with self._lock:
+            if platform_id in self._absent:
+                self._absent.move_to_end(platform_id)
+                return None, {}
+            entry = self._states.get(platform_id)
+        if entry:
+            state, data, touched = entry
+            if now - touched > self.ttl:
+                self.clear(platform_id)
+                return None, {}
+            return state, dict(data)
+
+        # First sighting of this id in this process: consult the database once
+        state, data = get_state(platform_id)
+        with self._lock:
+            if state:
+                self._states[platform_id] = (state, data, now)
+            else:
+                self._mark_absent(platform_id)
+        return state, dict(data)
+
+    def _mark_absent(self, platform_id):
+        """Caller holds the lock. An evicted id just costs one database read when it shows up again."""
+        self._absent[platform_id] = None
+        self._absent.move_to_end(platform_id)
+        while len(self._absent) > self.negative_cache_size:
+            self._absent.popitem(last=False)
+
+    def set(self, platform_id, platform, state, data=None):
+        set_state(platform_id, platform, state, data)
+        with self._lock:
+            self._states[platform_id] = (state, dict(data or {}), time.monotonic())
+            self._absent.pop(platform_id, None)
+
+    def clear(self, platform_id):
+        clear_state(platform_id)
+        with self._lock:
+            self._states.pop(platform_id, None)
+            self._mark_absent(platform_id)
+
+    def sweep(self):
+        """Expire abandoned flows in memory and in the database."""
+        now = time.monotonic()
+        self._last_sweep = now
+        with self._lock:
+            expired = [pid for pid, (_, _, touched) in self._states.items() if now - touched > self.ttl]
+            for pid in expired:
+                del self._states[pid]
+                self._mark_absent(pid)
+        try:
+            purge_stale_states(self.ttl)
+        except Exception as e:
+            print(f"⚠️ State sweep failed: {e}")
+        return len(expired)
+
+state_store = StateStore()
@@ -0,0 +1,162 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from app.core.config import (SUPERVISOR_HEARTBEAT_SECONDS, SUPERVISOR_HANG_SECONDS, SUPERVISOR_MAX_BACKOFF_SECONDS,
+                             SUPERVISOR_CRASH_LOOP_LIMIT, SUPERVISOR_CRASH_LOOP_WINDOW, SUPERVISOR_COOLDOWN_SECONDS)
+from app.core.metrics import metrics
+
+def start_heartbeat(heartbeat_queue, busy_probe=None, interval=SUPERVISOR_HEARTBEAT_SECONDS):
+    """
+    Run inside a bot process: report liveness to the supervisor every `interval` seconds.
+    `busy_probe()` returns how long the oldest in-flight message has been running (0 when idle),
+    so a process whose handler is stuck is caught even though this thread keeps beating.
+    """
+    name = multiprocessing.current_process().name
+    pid = os.getpid()
+
+    def beat():
+        while True:
+            try:
+                busy_for = busy_probe() if busy_probe else 0.0
+                heartbeat_queue.put_nowait((name, pid, time.time(), busy_for))
+            except Exception:
+                pass # A full or closed queue must never take the bot down
+            time.sleep(interval)
+
+    threading.Thread(target=beat, name="Heartbeat", daemon=True).start()
+
+class ManagedProcess:
+    """Book-keeping for one supervised bot process."""
+    def __init__(self, name, target, args):
+        self.name = name
+        self.target = target
+        self.args = args
+        self.process = None
+        self.started_at = 0.0
+        self.last_beat = 0.0
+        self.busy_for = 0.0
+        self.failures = 0          # Consecutive failed runs (drives the backoff)
+        self.restart_times = []    # Recent restarts (drives the crash-loop breaker)
+        self.next_start = 0.0      # Earliest time a restart may happen
+        self.restarts = 0
+
+class ProcessSupervisor:
+    """
+    Starts the bot processes and keeps them healthy.
+    Dead processes and hung ones (no heartbeat, or a single message busy for longer
+    than the hang timeout) are restarted with exponential backoff. Too many restarts
+    inside the crash-loop window pause restarts for a cool-off period.
+    """
+
+    BASE_BACKOFF = 1.0
+    STABLE_AFTER = 60.0 # A run this long resets the backoff
+
+    def __init__(self, hang_timeout=SUPERVISOR_HANG_SECONDS, max_backoff=SUPERVISOR_MAX_BACKOFF_SECONDS,
+                 crash_limit=SUPERVISOR_CRASH_LOOP_LIMIT, crash_window=SUPERVISOR_CRASH_LOOP_WINDOW,
+                 cooldown=SUPERVISOR_COOLDOWN_SECONDS):
+        self.hang_timeout = hang_timeout
+        self.max_backoff = max_backoff
+        self.crash_limit = crash_limit
+        self.crash_window = crash_window
+        self.cooldown = cooldown
+        self.heartbeats = multiprocessing.Queue()
+        self.managed = {}
+
+    def add(self, name, target, args):
+        """Register a bot; `target(*args, heartbeat=queue)` runs in the child process."""
+        self.managed[name] = ManagedProcess(name, target, args)
+
+    def _spawn(self, proc):
+        proc.process = multiprocessing.Process(target=proc.target, args=proc.args,
+                                               kwargs={"heartbeat": self.heartbeats}, name=proc.name)
+        proc.process.start()
+        proc.started_at = proc.last_beat = time.time() # Startup gets one full hang timeout of grace
+        proc.busy_for = 0.0
+
+    def start_all(self):
+        for proc in self.managed.values():
+            self._spawn(proc)
+
+    def _drain_heartbeats(self):
+        while True:
+            try:
+                name, pid, sent_at, busy_for = self.heartbeats.get_nowait()
+            except queue.Empty:
+                return
+            proc = self.managed.get(name)
+            # Ignore late beats from a process that was already replaced
+            if proc and proc.process and proc.process.pid == pid:
+                proc.last_beat = max(proc.last_beat, sent_at)
+                proc.busy_for = busy_for
+
+    def _health(self, proc, now):
+        """None when healthy, otherwise the reason it needs a restart."""
+        if proc.process is None:
+            return None
+        if not proc.process.is_alive():
+            return f"exited (code {proc.process.exitcode})"
+        if now - proc.last_beat > self.hang_timeout:
+            return f"no heartbeat for {now - proc.last_beat:.0f}s"
+        if proc.busy_for > self.hang_timeout:
+            return f"message handler stuck for {proc.busy_for:.0f}s"
+        return None
+
+    def _stop(self, proc):
+        p = proc.process
+        if p is not None and p.is_alive():
+            p.terminate()
+            p.join(5)
+            if p.is_alive():
+                p.kill()
+                p.join(5)
+        proc.process = None
+
+    def _schedule_restart(self, proc, reason, now):
+        ran_for = now - proc.started_at
+        proc.failures = 1 if ran_for >= self.STABLE_AFTER else proc.failures + 1
+        proc.restart_times = [t for t in proc.restart_times if now - t < self.crash_window] + [now]
+        metrics.incr(f"supervisor.{proc.name}.failures")
+
+        if len(proc.restart_times) > self.crash_limit:
+            proc.next_start = now + self.cooldown
+            proc.restart_times = []
+            metrics.incr(f"supervisor.{proc.name}.crash_loops")
+            print(f"🚨 {proc.name} is crash-looping ({reason}). Pausing restarts for {self.cooldown:.0f}s.")
+            return
+        delay = min(self.BASE_BACKOFF * 2 ** (proc.failures - 1), self.max_backoff)
+        proc.next_start = now + delay
+        print(f"⚠️ {proc.name} {reason} after {ran_for:.0f}s. Restarting in {delay:.0f}s...")
+
+    def poll(self):
+        """One supervision pass: read heartbeats, stop unhealthy processes, start due restarts."""
+        self._drain_heartbeats()
+        now = time.time()
+        for proc in self.managed.values():
+            reason = self._health(proc, now)
+            if reason:
+                if proc.process.is_alive():
+                    metrics.incr(f"supervisor.{proc.name}.hangs")
+                self._stop(proc)
+                self._schedule_restart(proc, reason, now)
+            elif proc.process is None and now >= proc.next_start:
+                self._spawn(proc)
+                proc.restarts += 1
+                metrics.incr(f"supervisor.{proc.name}.restarts")
+                print(f"🔁 {proc.name} restarted (#{proc.restarts}).")
+
+    def run_forever(self, interval=1.0):
+        while True:
+            self.poll()
+            time.sleep(interval)
+
+    def status(self):
+        now = time.time()
+        return {name: {"alive": bool(p.process and p.process.is_alive()), "restarts": p.restarts,
+                       "last_beat_age": round(now - p.last_beat, 1), "busy_for": round(p.busy_for, 1)}
+                for name, p in self.managed.items()}
+
+    def stop_all(self):
+        for proc in self.managed.values():
+            self._stop(proc)
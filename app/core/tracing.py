@@ -0,0 +1,36 @@
+import os
+import threading
+import time
+from app.core.metrics import metrics
+
+_local = threading.local()
+
+def new_trace_id():
+    """Start a trace for the message being handled on this thread."""
+    _local.trace_id = os.urandom(6).hex()
+    return _local.trace_id
+
+def current_trace_id():
+    return getattr(_local, "trace_id", None) or new_trace_id()
+
+def stamp(payload, kind):
+    """Tag an outbound queue payload with the current trace id, its kind and the enqueue time."""
+    payload["trace_id"] = current_trace_id()
+    payload["kind"] = kind
+    payload["enqueued_at"] = time.time() # Wall clock: compared across processes
+    return payload
+
+def record_delivery(item, platform):
+    """Called by a queue listener after sending; returns enqueue-to-send latency in ms (None if unstamped)."""
+    enqueued_at = item.get("enqueued_at")
+    if enqueued_at is None:
+        return None
+    latency_ms = max(0.0, (time.time() - enqueued_at) * 1000.0)
+    metrics.observe(f"ipc.{platform}.{item.get('kind', 'message')}", latency_ms)
+    return latency_ms
+
+def describe(item, latency_ms):
+    """Short log suffix for a delivered payload."""
+    if latency_ms is None:
+        return ""
+    return f" [trace {item.get('trace_id')}, {item.get('kind', 'message')}, {latency_ms:.0f} ms]"
@@ -0,0 +1,72 @@
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from app.core.config import TRAFFIC_RECORD_PATH, TRAFFIC_RECORD_SALT
+
+# Commands whose first argument is a username; it is kept as a keyed hash so a replay
+# against a copy of the database can map it back. Every other word is redacted.
+TARGET_COMMANDS = frozenset([
+    "/msg", "/chat", "/block", "/unblock", "/add_friend", "/accept", "/follow", "/unfollow",
+    "/info", "/otp_login", "/set_notify",
+])
+HASHED_PREFIX = "@"
+
+class TrafficRecorder:
+    """
+    Opt-in, append-only capture of inbound messages for load replay.
+    One compact JSON line per event: time, platform, keyed hash of the sender id
+    and redacted text (command word kept, other words replaced by same-length filler).
+    Each line goes out in a single O_APPEND write, so both bot processes can share a file.
+    """
+
+    def __init__(self, path=TRAFFIC_RECORD_PATH, salt=TRAFFIC_RECORD_SALT):
+        self.path = path
+        self.enabled = bool(path)
+        if self.enabled and not salt:
+            print("⚠️ TRAFFIC_RECORD_SALT not set: using a random salt, replays cannot map senders back to users.")
+            salt = os.urandom(16).hex()
+        self._key = (salt or "").encode()
+        self._fd = None
+        self._lock = threading.Lock()
+
+    def hash_value(self, value):
+        return hmac.new(self._key, str(value).encode(), hashlib.sha256).hexdigest()[:16]
+
+    def hash_sender(self, platform, platform_id):
+        return self.hash_value(f"{platform}:{platform_id}")
+
+    def redact(self, text):
+        words = (text or "").split()
+        if not words:
+            return ""
+        out = []
+        if words[0].startswith("/"):
+            command = words[0].lower()
+            out.append(command)
+            words = words[1:]
+            if command in TARGET_COMMANDS and words:
+                out.append(HASHED_PREFIX + self.hash_value(words[0].lower()))
+                words = words[1:]
+        out.extend("x" * len(w) for w in words)
+        return " ".join(out)
+
+    def record(self, platform, platform_id, text, has_media=False):
+        if not self.enabled:
+            return
+        event = {"t": round(time.time(), 3), "p": platform, "u": self.hash_sender(platform, platform_id), "m": self.redact(text)}
+        if has_media:
+            event["media"] = 1
+        line = (json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        try:
+            with self._lock:
+                if self._fd is None:
+                    self._fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+                os.write(self._fd, line)
+        except OSError as e:
+            print(f"⚠️ Traffic recording disabled: {e}")
+            self.enabled = False
+
+traffic_recorder = TrafficRecorder()
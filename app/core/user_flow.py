@@ -1,10 +1,12 @@
-from app.core.database import set_state, get_state, clear_state, register_user
+from app.core.database import register_user
+from app.core.state_store import state_store
+from app.core.personas import BUILTIN_PERSONAS, DEFAULT_PERSONA_ID
 import re
 
 class ConversationManager:
     """
     Handles interactive user flows (Registration, Onboarding).
-    Uses a state machine approach backed by the database.
+    Uses a state machine approach backed by the in-memory state store (written through to the database).
     """
     
     # States
@@ -25,13 +27,8 @@ class ConversationManager:
         "4": "https://api.dicebear.com/7.x/bottts/png?seed=123"
     }
 
-    # Personas
-    PERSONAS = {
-        "1": "You are a supportive, enthusiastic best friend. You use emojis, give compliments, and encourage the user with a warm, caring vibe.",
-        "2": "You are a sarcastic roast master. You make fun of the user playfully, you are witty, sassy, and never hold back on the humor.",
-        "3": "You are a professional, highly efficient executive assistant. You are polite, concise, formal, and focused on excellence.",
-        "4": "You are a mystical wizard. You speak in riddles, use archaic language, and reference ancient magic and hidden wisdom."
-    }
+    # Personas (menu number -> built-in persona text; stored on the user as a persona id)
+    PERSONAS = {str(pid): prompt for pid, _, prompt in BUILTIN_PERSONAS}
 
     def __init__(self):
         pass
@@ -41,7 +38,7 @@ class ConversationManager:
         Main entry point for handling input based on current state.
         Returns: (response_text, media_url_or_options, is_flow_complete)
         """
-        state, data = get_state(platform_id)
+        state, data = state_store.get(platform_id)
         
         if not state:
             return None, None, False
@@ -61,7 +58,7 @@ class ConversationManager:
 
             # Save username, move to next step
             data['username'] = text
-            set_state(platform_id, platform, self.STATE_REG_ACCOUNT_TYPE, data)
+            state_store.set(platform_id, platform, self.STATE_REG_ACCOUNT_TYPE, data)
             return (
                 "👑 [Step 2/7] **Choose your Path!**\n\n"
                 "What kind of account would you like?\n"
@@ -75,7 +72,7 @@ class ConversationManager:
             data['account_type'] = acc_type
             data['is_professional'] = 1 if acc_type == "professional" else 0
             
-            set_state(platform_id, platform, self.STATE_REG_EMAIL, data)
+            state_store.set(platform_id, platform, self.STATE_REG_EMAIL, data)
             return "✨ [Step 3/7] **Great choice!**\n\nWhat is your **Email Address**?\n\n_This helps us secure your account and recover it if you ever forget your password._", None, False
 
         elif state == self.STATE_REG_EMAIL:
@@ -84,7 +81,7 @@ class ConversationManager:
                 return "⚠️ *That doesn't look like a valid email.* Please try again:", None, False
                 
             data['email'] = text
-            set_state(platform_id, platform, self.STATE_REG_PASSWORD, data)
+            state_store.set(platform_id, platform, self.STATE_REG_PASSWORD, data)
             return "🔐 [Step 4/7] **Let's keep it secure!**\n\nCreate a **Strong Password**:\n\n_Tip: Use a mix of letters and numbers for maximum safety._", None, False
 
         elif state == self.STATE_REG_PASSWORD:
@@ -92,7 +89,7 @@ class ConversationManager:
                 return "⚠️ *Your password should be at least 6 characters.* Try again:", None, False
                 
             data['password'] = text
-            set_state(platform_id, platform, self.STATE_REG_GENDER, data)
+            state_store.set(platform_id, platform, self.STATE_REG_GENDER, data)
             return "👤 [Step 5/7] **Tell me about yourself.**\n\nWhat is your **Gender**? (he/she)\n\n_I'll use this to tailor my tone and how I address you!_", None, False
 
         elif state == self.STATE_REG_GENDER:
@@ -101,7 +98,7 @@ class ConversationManager:
             # Auto-align AI gender with user gender
             data['ai_gender'] = "she" if gender == "he" else "he" # Typical companion default
             
-            set_state(platform_id, platform, self.STATE_REG_AVATAR, data)
+            state_store.set(platform_id, platform, self.STATE_REG_AVATAR, data)
             
             # Show Avatar Options
             msg = "🎨 [Step 6/7] **Let's pick an Identity!**\n\nChoose your **Avatar**:\n\n"
@@ -118,7 +115,7 @@ class ConversationManager:
                 avatar_url = self.AVATARS[text]
             
             data['avatar_url'] = avatar_url
-            set_state(platform_id, platform, self.STATE_REG_PERSONA, data)
+            state_store.set(platform_id, platform, self.STATE_REG_PERSONA, data)
             
             msg = "🧠 [Step 7/7] **The Final Touch!**\n\nHow should I act around you? Choose my **Personality**:\n\n"
             msg += "1️⃣ 🤗 **Best Friend** (Always here for you)\n"
@@ -129,11 +126,9 @@ class ConversationManager:
             return msg, None, False
 
         elif state == self.STATE_REG_PERSONA:
-            system_prompt = self.PERSONAS.get("1") # Default
-            if text in self.PERSONAS:
-                system_prompt = self.PERSONAS[text]
+            persona_id = int(text) if text in self.PERSONAS else DEFAULT_PERSONA_ID
             
-            from app.core.database import update_system_prompt
+            from app.core.database import set_user_persona
             
             # Finalize Registration
             from app.core.database import set_professional_account
@@ -154,12 +149,12 @@ class ConversationManager:
             user = get_user_by_platform(platform, platform_id)
             if user:
                 u_id = user[0]
-                update_system_prompt(u_id, system_prompt)
+                set_user_persona(u_id, persona_id)
                 set_user_personalization(u_id, gender=data.get('gender'), ai_gender=data.get('ai_gender'))
                 if data.get('is_professional'):
                     set_professional_account(u_id, 1)
             
-            clear_state(platform_id)
+            state_store.clear(platform_id)
             
             onboarding_msg = "🎊 *Welcome to the Family!* 🎊\n\n"
             onboarding_msg += f"Your account for **{data['username']}** is officially active. I've set up your profile and personality just the way you like it.\n\n"
@@ -175,7 +170,7 @@ class ConversationManager:
 
     def start_registration(self, platform_id, platform):
         """Start the registration flow with a premium welcome."""
-        set_state(platform_id, platform, self.STATE_REG_USERNAME, {})
+        state_store.set(platform_id, platform, self.STATE_REG_USERNAME, {})
         welcome = (
             "🚀 **Welcome to TrueFriend AI**\n\n"
             "I'm about to become your favorite companion, but first, I need a few details to build your unique profile.\n\n"
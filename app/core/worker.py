@@ -0,0 +1,63 @@
+import time
+import zlib
+from app.core.metrics import metrics
+
+def shard_for(platform, platform_id, shards):
+    """Stable shard for a sender: every message from one platform id lands on the same worker (keeps per-user order)."""
+    return zlib.crc32(f"{platform}:{platform_id}".encode("utf-8")) % shards
+
+class InboundRouter:
+    """
+    Used by the platform processes in sharded mode: they only receive and send,
+    and hand each inbound message to the worker that owns the sender.
+    """
+
+    def __init__(self, inbound_queues):
+        self.inbound_queues = inbound_queues
+
+    def submit(self, platform, platform_id, text, reply_to, media_path=None):
+        shard = shard_for(platform, platform_id, len(self.inbound_queues))
+        self.inbound_queues[shard].put({
+            "platform": platform,
+            "platform_id": platform_id,
+            "text": text,
+            "media_path": media_path,
+            "reply_to": reply_to,
+            "received_at": time.time(),
+        })
+        return shard
+
+def run_worker(shard, inbound_queue, queues, heartbeat=None):
+    """
+    Worker process body: one UnifiedBot consuming its shard's inbound queue.
+    Replies go back through the platform's outbound queue.
+    """
+    from app.core.bot_core import UnifiedBot
+    from app.core.config import METRICS_PORT
+    from app.core.shutdown import install_shutdown_hook, run_shutdown_hooks
+    from app.core.supervisor import start_heartbeat
+
+    install_shutdown_hook() # SIGTERM/SIGINT exit cleanly; queued conversation turns are flushed
+    bot = UnifiedBot(queues)
+    if metrics.enabled and METRICS_PORT:
+        metrics.start_http_server(METRICS_PORT + 3 + shard) # PORT..PORT+2 belong to the bots and the supervisor
+    if heartbeat is not None:
+        start_heartbeat(heartbeat, bot.busy_for)
+    print(f"🧵 Worker shard {shard} [ACTIVE]")
+
+    try:
+        while True:
+            event = inbound_queue.get()
+            if event is None:
+                return
+            platform = event["platform"]
+            metrics.observe(f"worker.queue_wait.{platform}", max(0.0, time.time() - event["received_at"]) * 1000.0)
+            try:
+                response = bot.handle_message(event["text"] or "", platform, event["platform_id"],
+                                              media_path=event.get("media_path"), reply_to=event["reply_to"])
+                if response and queues and platform in queues:
+                    bot._enqueue(platform, event["reply_to"], response, "reply")
+            except Exception as e:
+                print(f"❌ Worker {shard} failed on a {platform} message: {e}")
+    finally:
+        run_shutdown_hooks()
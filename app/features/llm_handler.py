@@ -1,21 +1,36 @@
 import os
-import google.generativeai as genai
+import threading
+from collections import OrderedDict
 from typing import Optional
 
+genai = None # google.generativeai is imported on first use: it dominates bot cold start
+
+def _load_genai():
+    global genai
+    if genai is None:
+        import google.generativeai as _genai
+        genai = _genai
+    return genai
+
 class GeminiHandler:
     """Handles interactions with Google's Gemini API."""
+
+    MODEL_CACHE_SIZE = 64 # (api key, system prompt) pairs kept as ready GenerativeModel objects
     
     def __init__(self, api_key: Optional[str] = None):
         # We don't force API key on init anymore, but we can set a default
         self.api_key = api_key or os.getenv("GOOGLE_API_KEY")
         self.model = None
-        self.chat_session = None
-        
-        if self.api_key:
-            self._configure_model(self.api_key)
+        self.chat_session = None # Created lazily by reset_chat(); generate_response builds its own model
+        self._models = OrderedDict()
+        self._clients = OrderedDict() # api key -> GenerativeServiceClient bound to that key
+        self._models_lock = threading.Lock()
+        self._configure_lock = threading.Lock() # Only used when models cannot be bound to a key (see _bind_client)
+        self._warned_unbound = False
             
     def _configure_model(self, api_key: str):
         try:
+            genai = _load_genai()
             genai.configure(api_key=api_key)
             self.model = genai.GenerativeModel(
                 model_name='gemini-2.0-flash',
@@ -28,7 +43,7 @@ class GeminiHandler:
 
     def generate_response(self, user_input: str, user_api_key: Optional[str] = None, 
                           system_instruction: Optional[str] = None, history: list = None,
-                          image_path: Optional[str] = None) -> str:
+                          image_path: Optional[str] = None, prompt_key: Optional[str] = None) -> str:
         """Generate a response using the Gemini model, supporting optional image input."""
         
         # Use user-specific key if provided, else fallback to instance key
@@ -53,11 +68,8 @@ class GeminiHandler:
                 gemini_history.append({"role": "model", "parts": [res]})
 
         try:
-            genai.configure(api_key=active_key)
-            model = genai.GenerativeModel(
-                model_name='gemini-2.0-flash',
-                system_instruction=active_instruction
-            )
+            genai = _load_genai()
+            model, bound = self._model_for(genai, active_key, active_instruction, prompt_key)
             
             # Prepare content parts
             parts = [user_input]
@@ -67,18 +79,76 @@ class GeminiHandler:
                 img = PIL.Image.open(image_path)
                 parts.append(img)
             
-            # Start chat or direct generation
-            if gemini_history:
-                chat = model.start_chat(history=gemini_history)
-                response = chat.send_message(parts)
-            else:
-                response = model.generate_content(parts)
-                
-            return response.text
+            if bound:
+                return self._send(model, parts, gemini_history)
+            with self._configure_lock: # The process-wide key must not change under this call
+                genai.configure(api_key=active_key)
+                return self._send(model, parts, gemini_history)
         except Exception as e:
             return f"❌ Error generating response: {e}"
 
+    def _send(self, model, parts, gemini_history):
+        # Start chat or direct generation
+        if gemini_history:
+            chat = model.start_chat(history=gemini_history)
+            response = chat.send_message(parts)
+        else:
+            response = model.generate_content(parts)
+        return response.text
+
+    def _model_for(self, genai, api_key, instruction, prompt_key=None):
+        """
+        (model, bound) for this key and system prompt (`prompt_key` identifies the prompt cheaply).
+        Bound models carry their own key's client and are reused; unbound ones are built per call.
+        """
+        key = (api_key, prompt_key or instruction)
+        with self._models_lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                return model, True
+        model = genai.GenerativeModel(model_name='gemini-2.0-flash', system_instruction=instruction)
+        if not self._bind_client(model, api_key):
+            return model, False
+        with self._models_lock:
+            self._models[key] = model
+            while len(self._models) > self.MODEL_CACHE_SIZE:
+                self._models.popitem(last=False)
+        return model, True
+
+    def _bind_client(self, model, api_key):
+        """
+        Point `model` at a client for `api_key`. Unbound, a model takes whatever key genai.configure()
+        last set process-wide on its first call, so concurrent users would bill each other's keys.
+        google-generativeai has no public hook for this; if its private `_client` slot is gone,
+        return False and let the caller fall back to configure-and-call under a lock.
+        """
+        if not hasattr(model, "_client"):
+            if not self._warned_unbound:
+                self._warned_unbound = True
+                print("⚠️ google-generativeai models cannot be bound to a key; Gemini calls will be serialized.")
+            return False
+        model._client = self._client_for(api_key)
+        return True
+
+    def _client_for(self, api_key):
+        """One API client per key, shared by every model built for that key."""
+        with self._models_lock:
+            client = self._clients.get(api_key)
+            if client is not None:
+                self._clients.move_to_end(api_key)
+                return client
+        from google.ai import generativelanguage as glm # Installed with google.generativeai
+        client = glm.GenerativeServiceClient(client_options={"api_key": api_key})
+        with self._models_lock:
+            client = self._clients.setdefault(api_key, client)
+            while len(self._clients) > self.MODEL_CACHE_SIZE:
+                self._clients.popitem(last=False)
+        return client
+
     def reset_chat(self):
         """Reset the chat history."""
+        if not self.model and self.api_key:
+            self._configure_model(self.api_key)
         if self.model:
             self.chat_session = self.model.start_chat(history=[])
@@ -0,0 +1,30 @@
+import time
+import threading
+from app.core.database import purge_expired_stories
+
+class StorySweeper:
+    """Background TTL sweeper that removes expired stories in small batches."""
+
+    def __init__(self, batch_size=500):
+        self.batch_size = batch_size
+        self.running = False
+
+    def start_scheduler(self, interval=300):
+        self.running = True
+        thread = threading.Thread(target=self._run_loop, args=(interval,))
+        thread.daemon = True
+        thread.start()
+        print("🧹 Story Sweeper Started.")
+
+    def _run_loop(self, interval):
+        while self.running:
+            try:
+                removed = purge_expired_stories(batch_size=self.batch_size)
+                if removed:
+                    print(f"🧹 Swept {removed} expired stories.")
+            except Exception as e:
+                print(f"❌ Error sweeping stories: {e}")
+            time.sleep(interval)
+
+    def stop(self):
+        self.running = False
@@ -0,0 +1,115 @@
+import time
+import threading
+from collections import Counter
+from app.core.social_graph import social_graph
+from app.core.database import store_friend_suggestions, pop_dirty_suggestion_users
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    # Pure-Python friends-of-friends fallback is used instead
+    np = None
+    sparse = None
+
+class SuggestionEngine:
+    """
+    "People you may know" batch job.
+    Scores friends-of-friends by mutual-friend count (rows of A·A for the
+    friendship adjacency matrix A), drops existing friends and blocked users in
+    either direction, and stores the top-K per user in `friend_suggestions`.
+    """
+
+    TOP_K = 10
+    BATCH_ROWS = 1024 # Sparse rows multiplied per chunk during a full rebuild
+
+    def __init__(self, top_k=TOP_K):
+        self.top_k = top_k
+        self.running = False
+
+    def rebuild_all(self):
+        """Recompute suggestions for every user with at least one friend."""
+        friends, blocked = social_graph.snapshot()
+        results = self._compute(list(friends), friends, blocked)
+        store_friend_suggestions(results, replace_all=True)
+        return len(results)
+
+    def refresh_dirty(self):
+        """Recompute only the users whose neighbourhood changed since the last run."""
+        user_ids = pop_dirty_suggestion_users()
+        if not user_ids:
+            return 0
+        friends, blocked = social_graph.snapshot()
+        results = self._compute(user_ids, friends, blocked)
+        store_friend_suggestions(results)
+        return len(results)
+
+    def _compute(self, user_ids, friends, blocked):
+        # Blocks hide candidates in both directions
+        hidden = {}
+        for u, targets in blocked.items():
+            hidden.setdefault(u, set()).update(targets)
+            for t in targets:
+                hidden.setdefault(t, set()).add(u)
+        if sparse is not None:
+            return self._compute_sparse(user_ids, friends, hidden)
+        return self._compute_python(user_ids, friends, hidden)
+
+    def _exclusions(self, user_id, friends, hidden):
+        return {user_id} | friends.get(user_id, set()) | hidden.get(user_id, set())
+
+    def _top(self, scores, excluded):
+        ranked = sorted(((s, c) for c, s in scores.items() if c not in excluded), key=lambda x: (-x[0], x[1]))
+        return [(c, int(s)) for s, c in ranked[:self.top_k]]
+
+    def _compute_python(self, user_ids, friends, hidden):
+        results = {}
+        for u in user_ids:
+            scores = Counter()
+            for f in friends.get(u, ()):
+                scores.update(friends.get(f, ()))
+            results[u] = self._top(scores, self._exclusions(u, friends, hidden))
+        return results
+
+    def _compute_sparse(self, user_ids, friends, hidden):
+        nodes = sorted(set(friends) | {f for fs in friends.values() for f in fs})
+        index = {u: i for i, u in enumerate(nodes)}
+        rows = [index[u] for u, fs in friends.items() for _ in fs]
+        cols = [index[f] for fs in friends.values() for f in fs]
+        n = len(nodes)
+        adjacency = sparse.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=(n, n))
+
+        results = {u: [] for u in user_ids if u not in index}
+        known = [u for u in user_ids if u in index]
+        for start in range(0, len(known), self.BATCH_ROWS):
+            chunk = known[start:start + self.BATCH_ROWS]
+            fof = adjacency[[index[u] for u in chunk]] @ adjacency # mutual counts per candidate
+            for row, u in enumerate(chunk):
+                lo, hi = fof.indptr[row], fof.indptr[row + 1]
+                scores = dict(zip((nodes[j] for j in fof.indices[lo:hi]), fof.data[lo:hi]))
+                results[u] = self._top(scores, self._exclusions(u, friends, hidden))
+        return results
+
+    def start_scheduler(self, interval=60):
+        """Full rebuild once, then incremental refreshes every `interval` seconds."""
+        self.running = True
+        thread = threading.Thread(target=self._run_loop, args=(interval,))
+        thread.daemon = True
+        thread.start()
+        print("🧭 Friend Suggestion Engine Started.")
+
+    def _run_loop(self, interval):
+        try:
+            count = self.rebuild_all()
+            print(f"🧭 Suggestions rebuilt for {count} users.")
+        except Exception as e:
+            print(f"❌ Error rebuilding suggestions: {e}")
+        while self.running:
+            time.sleep(interval)
+            try:
+                self.refresh_dirty()
+            except Exception as e:
+                print(f"❌ Error refreshing suggestions: {e}")
+
+    def stop(self):
+        self.running = False
@@ -0,0 +1,97 @@
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from app.core.security import SecurityManager, zstandard
+
+# Building blocks for responses shaped like real Gemini replies (markdown, emojis, lists)
+OPENERS = [
+    "Oh wow, that's honestly such a big moment for you! 🎉",
+    "Hey, I totally get where you're coming from. 💙",
+    "Okay, let's break this down together, step by step. 🧠",
+    "Haha, you really know how to make my day! 😂",
+    "That sounds like a lot to carry right now, and I'm glad you told me. 🤗",
+]
+SENTENCES = [
+    "The most important thing is that you keep showing up for yourself, even on the days when it feels hard.",
+    "If you want, we can plan out the next few days so it feels a little less overwhelming.",
+    "Honestly, most people would have given up already, so the fact that you're still trying says a lot about you.",
+    "Try writing down three small wins from today before you go to sleep; it sounds silly but it really helps.",
+    "Remember that progress is rarely a straight line, and a bad week doesn't erase everything you've built.",
+    "I think you should talk to them directly, but keep it calm and focus on how it made you feel.",
+    "A quick walk outside, a glass of water and ten minutes away from your phone can reset your whole mood.",
+    "You don't have to have everything figured out right now; you just need a next step.",
+]
+BULLETS = [
+    "**Sleep first** - a tired brain makes every problem look bigger 😴",
+    "**Move a little** - even a 10 minute walk counts 🚶",
+    "**Eat something real** - not just coffee and snacks ☕",
+    "**Message someone you trust** - you're not alone in this 💬",
+    "**Break the task into tiny pieces** - then just do the first one ✅",
+    "**Celebrate the small stuff** - it adds up faster than you think 🎊",
+]
+CLOSERS = [
+    "I'm always here if you want to talk more. What's on your mind right now? 💭",
+    "You've got this, and I'm cheering for you every step of the way! 🚀",
+    "Tell me how it goes, okay? I genuinely want to know. ✨",
+]
+
+def make_response(rng):
+    parts = [rng.choice(OPENERS), ""]
+    parts.extend(rng.sample(SENTENCES, rng.randint(2, 5)))
+    if rng.random() < 0.7:
+        parts.append("\nHere's what I'd do:")
+        parts.extend(f"• {b}" for b in rng.sample(BULLETS, rng.randint(3, 5)))
+    parts.extend(["", rng.choice(CLOSERS)])
+    return "\n".join(parts)
+
+def make_message(rng):
+    return rng.choice(["hey", "I failed my exam today", "can you help me plan my week?", "I'm so tired lol",
+                       "what should I do about my friend ignoring me", "good morning!!"])
+
+def run_case(label, manager, turns, path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("CREATE TABLE conversations (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, message TEXT, response TEXT, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)")
+
+    start = time.perf_counter()
+    rows = [(i % 100, manager.encrypt(m), manager.encrypt(r)) for i, (m, r) in enumerate(turns)]
+    conn.executemany("INSERT INTO conversations (user_id, message, response) VALUES (?, ?, ?)", rows)
+    conn.commit()
+    write_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for msg, res in conn.execute("SELECT message, response FROM conversations"):
+        manager.decrypt(msg)
+        manager.decrypt(res)
+    read_s = time.perf_counter() - start
+
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+    size_kb = os.path.getsize(path) / 1024
+    print(f"{label:<10} | DB {size_kb:>9.1f} KB | write {len(turns) / write_s:>8.0f} turns/s | read {len(turns) / read_s:>8.0f} turns/s")
+    return size_kb
+
+def bench_compression(n_turns=5000):
+    rng = random.Random(42)
+    turns = [(make_message(rng), make_response(rng)) for _ in range(n_turns)]
+    avg_len = sum(len(r) for _, r in turns) / n_turns
+    print(f"--- Payload Compression Benchmark: {n_turns} turns, avg response {avg_len:.0f} chars ---")
+
+    cases = [("off", SecurityManager(compression="off")), ("zlib", SecurityManager(compression="zlib"))]
+    if zstandard:
+        cases.append(("zstd", SecurityManager(compression="zstd")))
+    else:
+        print("(zstandard not installed - skipping zstd)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sizes = {label: run_case(label, m, turns, os.path.join(tmp, f"{label}.db")) for label, m in cases}
+
+    for label, size in sizes.items():
+        if label != "off":
+            print(f"✅ {label}: DB size {100 * size / sizes['off']:.0f}% of uncompressed")
+
+if __name__ == "__main__":
+    bench_compression(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
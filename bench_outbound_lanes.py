@@ -0,0 +1,63 @@
+import argparse
+import multiprocessing
+import sys
+import threading
+import time
+
+from app.core import tracing
+from app.core.ipc import OutboundQueue
+
+def producer(q, broadcast, interactive, otps):
+    """A /broadcast burst, then replies and OTPs trickling in behind it."""
+    for i in range(broadcast):
+        q.put(tracing.stamp({"target": f"u{i}", "text": "📢 update"}, "broadcast"))
+    for i in range(max(interactive, otps)):
+        if i < interactive:
+            q.put(tracing.stamp({"target": f"r{i}", "text": "reply"}, "reply"))
+        if i < otps:
+            q.put(tracing.stamp({"target": f"o{i}", "text": "🔐 OTP"}, "otp"))
+        time.sleep(0.001)
+
+def drain(q, total, send_ms):
+    """Listener stand-in: every send costs `send_ms`; returns {kind: [wait ms, ...]}."""
+    waits = {}
+    for _ in range(total):
+        item = q.get()
+        waits.setdefault(item["kind"], []).append((time.time() - item["enqueued_at"]) * 1000.0)
+        time.sleep(send_ms / 1000.0)
+    return waits
+
+def run(q, args):
+    total = args.broadcast + args.interactive + args.otps
+    thread = threading.Thread(target=producer, args=(q, args.broadcast, args.interactive, args.otps))
+    thread.start()
+    waits = drain(q, total, args.send_ms)
+    thread.join()
+    return waits
+
+def report(label, waits):
+    print(f"\n{label}")
+    print(f"{'kind':<12} {'n':>6} {'p50 ms':>9} {'max ms':>9}")
+    for kind, values in sorted(waits.items()):
+        values.sort()
+        print(f"{kind:<12} {len(values):>6} {values[len(values) // 2]:>9.0f} {values[-1]:>9.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Outbound queue wait per kind: single FIFO vs priority lanes")
+    parser.add_argument("--broadcast", type=int, default=2000)
+    parser.add_argument("--interactive", type=int, default=100)
+    parser.add_argument("--otps", type=int, default=20)
+    parser.add_argument("--send-ms", type=float, default=0.5, help="simulated cost of one platform send")
+    args = parser.parse_args()
+
+    fifo = run(multiprocessing.Queue(), args)
+    lanes = run(OutboundQueue("bench"), args)
+    report("📦 Single FIFO (before)", fifo)
+    report("🚦 Priority lanes", lanes)
+
+    fifo_otp, lane_otp = max(fifo["otp"]), max(lanes["otp"])
+    print(f"\n✅ Worst OTP wait {fifo_otp:.0f} ms -> {lane_otp:.0f} ms")
+    return 0 if lane_otp <= fifo_otp else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
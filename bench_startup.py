@@ -0,0 +1,72 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+# What a bot process pays on every (re)start before it can handle a message
+CHILD = """
+import time
+start = time.perf_counter()
+from app.core.bot_core import UnifiedBot
+imported = time.perf_counter()
+UnifiedBot()
+ready = time.perf_counter()
+print(f"STARTUP {(imported - start) * 1000:.1f} {(ready - imported) * 1000:.1f}")
+"""
+
+def parse_importtime(stderr):
+    """(cumulative_us, module) for every line of `python -X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name[1:].rstrip())) # Nesting depth is kept as leading spaces
+    return rows
+
+def run_once(env):
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD], env=env,
+                          capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    line = next(l for l in proc.stdout.splitlines() if l.startswith("STARTUP"))
+    import_ms, init_ms = (float(x) for x in line.split()[1:])
+    return import_ms, init_ms, parse_importtime(proc.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description="Bot process cold-start benchmark (python -X importtime)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", "400")),
+                        help="median import + UnifiedBot() time a restart must stay under")
+    parser.add_argument("--top", type=int, default=15, help="slowest top-level imports to list")
+    args = parser.parse_args()
+
+    # Schema is created once up front, as main.py does before spawning the bots
+    tmp = tempfile.TemporaryDirectory()
+    env = dict(os.environ, DB_NAME=os.path.join(tmp.name, "startup.db"))
+    subprocess.run([sys.executable, "-c", "from app.core.database import init_db; init_db()"], env=env, check=True,
+                   capture_output=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    results = [run_once(env) for _ in range(args.runs)]
+    totals = sorted(i + n for i, n, _ in results)
+    median = totals[len(totals) // 2]
+    import_ms = sorted(i for i, _, _ in results)[len(results) // 2]
+    init_ms = sorted(n for _, n, _ in results)[len(results) // 2]
+
+    # Slowest modules from the last (warm page cache) run, two levels deep
+    rows = [(us, name) for us, name in results[-1][2] if not name.startswith("    ")]
+    rows.sort(reverse=True)
+    print(f"{'cumulative ms':>14}  module")
+    for us, name in rows[:args.top]:
+        print(f"{us / 1000:>14.1f}  {name}")
+
+    print(f"\n📦 import app.core.bot_core: {import_ms:.0f} ms | UnifiedBot(): {init_ms:.0f} ms | total median {median:.0f} ms over {args.runs} runs")
+    if median > args.budget_ms:
+        print(f"❌ Startup {median:.0f} ms is over the {args.budget_ms:.0f} ms budget.")
+        return 1
+    print(f"✅ Within the {args.budget_ms:.0f} ms budget.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
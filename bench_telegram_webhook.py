@@ -0,0 +1,111 @@
+import argparse
+import asyncio
+import http.client
+import json
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+SECRET = "bench-secret"
+
+def make_update(update_id, user_id, text):
+    """Synthetic private-chat text message shaped like Telegram's Update JSON."""
+    user = {"id": user_id, "is_bot": False, "first_name": f"User{user_id}"}
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private", "first_name": user["first_name"]},
+            "from": user,
+            "text": text,
+        },
+    }
+
+def client(url, secret, start_id, count, users, latencies):
+    target = urlparse(url)
+    conn = http.client.HTTPConnection(target.hostname, target.port, timeout=10)
+    headers = {"Content-Type": "application/json", "X-Telegram-Bot-Api-Secret-Token": secret}
+    for i in range(count):
+        update_id = start_id + i
+        body = json.dumps(make_update(update_id, 1000 + update_id % users, "hello from the bench"))
+        t0 = time.perf_counter()
+        conn.request("POST", target.path, body=body, headers=headers)
+        resp = conn.getresponse()
+        resp.read()
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+        if resp.status != 200:
+            raise RuntimeError(f"webhook answered {resp.status}")
+    conn.close()
+
+def start_local_server(path):
+    """In-process WebhookServer feeding an asyncio queue that just counts updates (no Telegram, no handlers)."""
+    from telegram import Bot
+    from app.bots.telegram_webhook import WebhookServer
+
+    loop = asyncio.new_event_loop()
+    update_queue = asyncio.Queue()
+    consumed = [0]
+
+    async def consume():
+        while True:
+            await update_queue.get()
+            consumed[0] += 1
+
+    ready = threading.Event()
+    def run_loop():
+        asyncio.set_event_loop(loop)
+        loop.create_task(consume())
+        loop.call_soon(ready.set)
+        loop.run_forever()
+    threading.Thread(target=run_loop, daemon=True).start()
+    ready.wait()
+
+    server = WebhookServer(Bot("123456:BENCH"), update_queue, loop, "127.0.0.1", 0, path, SECRET)
+    server.start()
+    host, port = server.address[:2]
+    return f"http://{host}:{port}/{path}", consumed
+
+def main():
+    parser = argparse.ArgumentParser(description="Post synthetic Telegram updates to a webhook and measure ingestion rate")
+    parser.add_argument("--url", help="running webhook (e.g. http://127.0.0.1:8443/telegram); default: in-process server")
+    parser.add_argument("--secret", default=None, help="secret token header (default: the bench secret)")
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--clients", type=int, default=8, help="concurrent keep-alive connections")
+    parser.add_argument("--users", type=int, default=500)
+    args = parser.parse_args()
+
+    consumed = None
+    url, secret = args.url, args.secret
+    if url is None:
+        url, consumed = start_local_server("bench-hook")
+        secret = SECRET
+    secret = secret or ""
+
+    per_client = args.updates // args.clients
+    latencies = []
+    threads = [threading.Thread(target=client, args=(url, secret, 1 + i * per_client, per_client, args.users, latencies))
+               for i in range(args.clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    total = per_client * args.clients
+    if consumed is not None:
+        while consumed[0] < total and time.perf_counter() - start < 30:
+            time.sleep(0.01)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    pick = lambda p: latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))]
+    print(f"📨 {total} updates over {args.clients} connections to {url}")
+    print(f"⏱️ POST latency p50 {pick(50):.2f} ms | p95 {pick(95):.2f} ms | p99 {pick(99):.2f} ms")
+    if consumed is not None:
+        print(f"📥 {consumed[0]} updates reached the application queue")
+    print(f"✅ {total / elapsed:.0f} updates/sec")
+    return 0 if consumed is None or consumed[0] == total else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
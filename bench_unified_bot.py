@@ -0,0 +1,172 @@
+import argparse
+import os
+import queue
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+# Point the app at a throwaway database before anything imports the config
+_TMP = tempfile.TemporaryDirectory()
+os.environ["DB_NAME"] = os.path.join(_TMP.name, "bench.db")
+
+import bcrypt
+from app.core.metrics import Histogram
+
+# Weighted traffic mix: (weight, kind). "chat" is free text that reaches the (stub) LLM path.
+TRAFFIC_MIX = [
+    (50, "chat"), (8, "/feed"), (8, "/msg"), (6, "/inbox"), (5, "/friends"), (4, "/suggest"),
+    (4, "/stories"), (3, "/post"), (3, "/like"), (3, "/follow"), (3, "/info"), (2, "/search"), (1, "/help"),
+]
+CHAT_LINES = ["hey, how are you?", "I had such a long day", "can you help me plan my week?",
+              "tell me something fun", "what do you think about my idea?", "good morning!!"]
+
+class StubChatBot:
+    """Stands in for ChatBot: fixed-cost reply, no network."""
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.name = "TrueFriend"
+        self.version = "bench"
+        self.user_name = None
+
+    def generate_response(self, user_input, **kwargs):
+        if self.delay:
+            time.sleep(self.delay)
+        return f"That's interesting! Tell me more about '{user_input[:40]}' 😊"
+
+def build_population(db_name, n_users, friends_per_user, rng):
+    """Insert users, an accepted friend graph, follows, posts and live stories directly (no bcrypt per user)."""
+    password_hash = bcrypt.hashpw(b"bench-password", bcrypt.gensalt(rounds=4)).decode()
+    conn = sqlite3.connect(db_name)
+    c = conn.cursor()
+    users = []
+    for i in range(n_users):
+        platform = "telegram" if i % 2 else "whatsapp"
+        users.append((f"user{i}", password_hash, f"wa{i}" if platform == "whatsapp" else None,
+                      f"tg{i}" if platform == "telegram" else None, platform))
+    c.executemany("INSERT INTO users (username, password_hash, whatsapp_id, telegram_id, preferred_platform) VALUES (?, ?, ?, ?, ?)", users)
+    ids = [r[0] for r in c.execute("SELECT id FROM users ORDER BY id")]
+
+    edges = set()
+    for u in ids:
+        for v in rng.sample(ids, min(friends_per_user, len(ids) - 1)):
+            if u != v:
+                edges.add((min(u, v), max(u, v)))
+    c.executemany("INSERT INTO friends (user1_id, user2_id, status) VALUES (?, ?, 'accepted')", sorted(edges))
+    c.executemany("INSERT OR IGNORE INTO follows (follower_id, followed_id) VALUES (?, ?)",
+                  [(u, rng.choice(ids)) for u in ids for _ in range(3)])
+    c.executemany("INSERT INTO posts (user_id, content, visibility, post_type) VALUES (?, ?, 'public', 'post')",
+                  [(rng.choice(ids), f"Post number {i} #bench") for i in range(n_users * 2)])
+    expires = (datetime.now() + timedelta(hours=12)).strftime('%Y-%m-%d %H:%M:%S')
+    c.executemany("INSERT INTO stories (user_id, content, expires_at) VALUES (?, ?, ?)",
+                  [(rng.choice(ids), f"Story {i}", expires) for i in range(n_users // 2)])
+    conn.commit()
+    conn.close()
+    friends = {}
+    for a, b in edges:
+        friends.setdefault(a, []).append(b)
+        friends.setdefault(b, []).append(a)
+    return ids, friends, len(edges)
+
+def make_message(kind, user_idx, ids, friends, rng):
+    if kind == "chat":
+        return rng.choice(CHAT_LINES)
+    other = rng.randrange(len(ids))
+    if kind == "/msg":
+        pals = friends.get(ids[user_idx])
+        target = rng.choice(pals) - ids[0] if pals else other # ids are contiguous; loners hit the non-friend path
+        return f"/msg user{target} hello from the benchmark"
+    if kind == "/post":
+        return "/post Benchmarking the feed today #perf"
+    if kind == "/like":
+        return f"/like {rng.randint(1, len(ids) * 2)}"
+    if kind in ("/follow", "/info"):
+        return f"{kind} user{other}"
+    if kind == "/search":
+        return f"/search user{rng.randint(1, 99)}"
+    return kind
+
+def drain(queues, delivered, stop):
+    """Plays the platform processes: consume outbound payloads as fast as they arrive."""
+    while not stop.is_set():
+        idle = True
+        for q in queues.values():
+            try:
+                q.get_nowait()
+                delivered[0] += 1
+                idle = False
+            except queue.Empty:
+                pass
+        if idle:
+            time.sleep(0.001)
+
+def run(args):
+    from app.core.config import DB_NAME
+    from app.core.database import init_db
+    init_db()
+    rng = random.Random(args.seed)
+    t0 = time.perf_counter()
+    ids, friends, n_edges = build_population(DB_NAME, args.users, args.friends, rng)
+    print(f"👥 Population: {len(ids)} users, {n_edges} friendships ({time.perf_counter() - t0:.1f}s)")
+
+    from app.core.bot_core import UnifiedBot
+    from app.core.conversation_logger import conversation_logger
+    queues = {"whatsapp": queue.Queue(), "telegram": queue.Queue()}
+    bot = UnifiedBot(queues)
+    bot.chatbot = StubChatBot(args.llm_delay)
+    bot.coalescer = None # Measure the LLM path inline rather than behind the debounce timer
+    bot.rate_limiter = None # Synthetic senders fire far faster than real users
+
+    weights = [w for w, _ in TRAFFIC_MIX]
+    kinds = [k for _, k in TRAFFIC_MIX]
+    plan = []
+    for _ in range(args.messages):
+        idx = rng.randrange(len(ids))
+        kind = rng.choices(kinds, weights)[0]
+        platform, pid = ("telegram", f"tg{idx}") if idx % 2 else ("whatsapp", f"wa{idx}")
+        plan.append((kind, make_message(kind, idx, ids, friends, rng), platform, pid))
+
+    histograms = {}
+    lock = threading.Lock()
+    delivered, stop = [0], threading.Event()
+    threading.Thread(target=drain, args=(queues, delivered, stop), daemon=True).start()
+
+    def worker(chunk):
+        for kind, text, platform, pid in chunk:
+            start = time.perf_counter()
+            bot.handle_message(text, platform, pid)
+            ms = (time.perf_counter() - start) * 1000.0
+            with lock:
+                histograms.setdefault(kind, Histogram()).record(ms)
+                histograms.setdefault("ALL", Histogram()).record(ms)
+
+    print(f"🚦 Driving {args.messages} messages on {args.threads} thread(s)...")
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(plan[i::args.threads],)) for i in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    conversation_logger.flush()
+    stop.set()
+
+    print(f"\n{'command':<12} {'n':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for kind, hist in sorted(histograms.items(), key=lambda kv: -kv[1].percentile(95)):
+        s = hist.summary()
+        print(f"{kind:<12} {s['count']:>7} {s['p50_ms']:>9.2f} {s['p95_ms']:>9.2f} {s['p99_ms']:>9.2f} {s['max_ms']:>9.2f}")
+    print(f"\n✅ {args.messages / elapsed:.0f} msgs/sec over {elapsed:.1f}s, {delivered[0]} queue deliveries")
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline throughput benchmark for UnifiedBot.handle_message")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--friends", type=int, default=8, help="friend edges drawn per user")
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=1, help="concurrent platform callbacks")
+    parser.add_argument("--llm-delay", type=float, default=0.0, help="seconds the stub LLM sleeps per reply")
+    parser.add_argument("--seed", type=int, default=42)
+    sys.exit(run(parser.parse_args()))
@@ -19,27 +19,47 @@ try:
 except AttributeError:
     pass
 
-def start_whatsapp(queue, login_info=None):
+def start_whatsapp(queue, login_info=None, inbound=None, heartbeat=None):
     """Function to run WhatsApp bot in a separate process."""
     try:
         from app.bots.whatsapp_bot import run_whatsapp_bot
-        run_whatsapp_bot(queue, login_info)
+        run_whatsapp_bot(queue, login_info, heartbeat=heartbeat, inbound=inbound)
     except Exception as e:
         print(f"{Fore.RED}❌ WhatsApp Bot Crashed: {e}{Style.RESET_ALL}")
 
-def start_telegram(queue):
+def start_telegram(queue, inbound=None, heartbeat=None):
     """Function to run Telegram bot in a separate process."""
     try:
         from app.bots.telegram_bot import run_telegram_bot
-        run_telegram_bot(queue)
+        run_telegram_bot(queue, heartbeat=heartbeat, inbound=inbound)
     except Exception as e:
         print(f"{Fore.RED}❌ Telegram Bot Crashed: {e}{Style.RESET_ALL}")
 
+def start_worker(shard, inbound, queue, heartbeat=None):
+    """Function to run one UnifiedBot worker shard in a separate process."""
+    try:
+        from app.core.worker import run_worker
+        run_worker(shard, inbound, queue, heartbeat=heartbeat)
+    except Exception as e:
+        print(f"{Fore.RED}❌ Worker {shard} Crashed: {e}{Style.RESET_ALL}")
+
 def main():
     """Main entry point for the Multi-Bot system."""
+    # Schema setup and migrations run once here; bot processes (and their restarts) skip it
+    from app.core.database import init_db
+    init_db()
+    # Older databases need one full VACUUM for incremental vacuum; do it while nothing else is writing
+    from app.core.retention import RetentionManager
+    try:
+        RetentionManager().ensure_incremental_vacuum()
+    except Exception as e:
+        print(f"⚠️ Could not enable incremental vacuum: {e}")
+
+    # Outbound IPC: critical / interactive / bulk lanes so OTPs never wait behind a broadcast
+    from app.core.ipc import OutboundQueue
     queues = {
-        "whatsapp": multiprocessing.Queue(),
-        "telegram": multiprocessing.Queue()
+        "whatsapp": OutboundQueue("whatsapp"),
+        "telegram": OutboundQueue("telegram")
     }
 
     # Initial check for WhatsApp setup
@@ -66,37 +86,46 @@ def main():
         else:
             login_info = {"method": "qr"}
 
-    def create_process(name, target, args):
-        p = multiprocessing.Process(target=target, args=args, name=name)
-        p.start()
-        return p
+    # Heartbeats, hang detection, restart backoff and a crash-loop breaker
+    from app.core.supervisor import ProcessSupervisor
+    supervisor = ProcessSupervisor()
+
+    # Optional sharded workers: inbound messages are partitioned by a stable hash of the sender id
+    from app.core.config import WORKER_SHARDS
+    inbound = [multiprocessing.Queue() for _ in range(WORKER_SHARDS)] or None
+    for shard in range(WORKER_SHARDS):
+        supervisor.add(f"Worker-{shard}", start_worker, (shard, inbound[shard], queues))
+    if inbound:
+        print(f"🧵 Running {WORKER_SHARDS} UnifiedBot worker shards.")
+
+    supervisor.add("WhatsAppBot", start_whatsapp, (queues, login_info, inbound)) # Restarts keep login_info
+    supervisor.add("TelegramBot", start_telegram, (queues, inbound))
+    supervisor.start_all()
 
-    # Initial start
-    p_whatsapp = create_process("WhatsAppBot", start_whatsapp, (queues, login_info))
-    p_telegram = create_process("TelegramBot", start_telegram, (queues,))
+    from app.core.config import METRICS_PORT
+    from app.core.metrics import metrics
+    if metrics.enabled and METRICS_PORT:
+        metrics.start_http_server(METRICS_PORT + 2) # Restart counters; the bots use PORT and PORT+1
+
+    # Background batch jobs run once, here in the supervisor process
+    from app.core.config import SUGGESTION_REFRESH_SECONDS, STORY_SWEEP_SECONDS, RETENTION_INTERVAL_SECONDS
+    from app.features.suggestions import SuggestionEngine
+    from app.features.stories import StorySweeper
+    suggestion_engine = SuggestionEngine()
+    suggestion_engine.start_scheduler(interval=SUGGESTION_REFRESH_SECONDS)
+    story_sweeper = StorySweeper()
+    story_sweeper.start_scheduler(interval=STORY_SWEEP_SECONDS)
+    retention = RetentionManager()
+    retention.start_scheduler(interval=RETENTION_INTERVAL_SECONDS)
 
     print(f"\n{Fore.WHITE}✅ Both bots are connected via IPC Queues.")
     print(f"Press {Fore.YELLOW}Ctrl+C{Fore.WHITE} to stop the system.\n")
 
     try:
-        while True:
-            time.sleep(5)
-            # Monitor and restart WhatsApp Bot
-            if not p_whatsapp.is_alive():
-                print(f"{Fore.RED}⚠️ WhatsApp Bot stopped. Restarting...{Style.RESET_ALL}")
-                p_whatsapp = create_process("WhatsAppBot", start_whatsapp, (queues,))
-            
-            # Monitor and restart Telegram Bot
-            if not p_telegram.is_alive():
-                print(f"{Fore.RED}⚠️ Telegram Bot stopped. Restarting...{Style.RESET_ALL}")
-                p_telegram = create_process("TelegramBot", start_telegram, (queues,))
-                
+        supervisor.run_forever()
     except KeyboardInterrupt:
         print(f"\n{Fore.YELLOW}🛑 Shutting down system...{Style.RESET_ALL}")
-        if p_whatsapp.is_alive(): p_whatsapp.terminate()
-        if p_telegram.is_alive(): p_telegram.terminate()
-        p_whatsapp.join()
-        p_telegram.join()
+        supervisor.stop_all()
         print(f"{Fore.GREEN}👋 System shutdown complete.{Style.RESET_ALL}")
 
 if __name__ == "__main__":
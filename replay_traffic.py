@@ -0,0 +1,131 @@
+import argparse
+import json
+import os
+import queue
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+def parse_speed(value):
+    return 0.0 if value == "max" else float(value.rstrip("x"))
+
+def copy_database(source, dest):
+    """Consistent snapshot of the live database (safe while the bots are running)."""
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(dest)
+    src.backup(dst)
+    src.close()
+    dst.close()
+
+def load_events(path):
+    with open(path, encoding="utf-8") as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    events.sort(key=lambda e: e["t"])
+    return events
+
+class StubChatBot:
+    """Fixed-cost replacement for the LLM so replays measure the bot, not Gemini."""
+    def __init__(self):
+        self.name = "TrueFriend"
+        self.version = "replay"
+        self.user_name = None
+
+    def generate_response(self, user_input, **kwargs):
+        return f"Replay reply to '{user_input[:40]}'"
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded traffic file against a copy of the database")
+    parser.add_argument("recording", help="JSONL file written with TRAFFIC_RECORD_PATH")
+    parser.add_argument("--db", help="database to copy (default: the configured DB_NAME)")
+    parser.add_argument("--speed", default="1", help="1, 10, 1x, 10x ... or 'max'")
+    parser.add_argument("--salt", default=os.getenv("TRAFFIC_RECORD_SALT", ""), help="salt used while recording")
+    args = parser.parse_args()
+    speed = parse_speed(args.speed)
+
+    tmp = tempfile.TemporaryDirectory()
+    replay_db = os.path.join(tmp.name, "replay.db")
+    from app.core import config
+    copy_database(args.db or config.DB_NAME, replay_db)
+    config.DB_NAME = replay_db # Modules imported below bind DB_NAME at import time, so they all use the copy
+
+    from app.core.metrics import Histogram
+    from app.core.traffic_recorder import TrafficRecorder, HASHED_PREFIX
+    from app.core.database import init_db
+    init_db()
+
+    # Map hashed senders and usernames back to real values in the copied database
+    hasher = TrafficRecorder(path=None, salt=args.salt)
+    senders, usernames = {}, {}
+    conn = sqlite3.connect(replay_db)
+    for username, wa_id, tg_id in conn.execute("SELECT username, whatsapp_id, telegram_id FROM users"):
+        usernames[HASHED_PREFIX + hasher.hash_value(username.lower())] = username
+        if wa_id:
+            senders[hasher.hash_sender("whatsapp", wa_id)] = wa_id
+        if tg_id:
+            senders[hasher.hash_sender("telegram", tg_id)] = tg_id
+    conn.close()
+
+    events = load_events(args.recording)
+    if not events:
+        print("❌ Recording is empty.")
+        return 1
+    known = sum(1 for e in events if e["u"] in senders)
+    print(f"🎞️ {len(events)} events, {known} from senders found in the database copy, speed {args.speed}")
+
+    from app.core.bot_core import UnifiedBot
+    from app.core.conversation_logger import conversation_logger
+    queues = {"whatsapp": queue.Queue(), "telegram": queue.Queue()}
+    bot = UnifiedBot(queues)
+    bot.chatbot = StubChatBot()
+    bot.coalescer = None # Time each chat message inline rather than behind the debounce timer
+    bot.rate_limiter = None # Sped-up replay would trip the per-user limits
+
+    stop = threading.Event()
+    def drain():
+        while not stop.is_set():
+            for q in queues.values():
+                while not q.empty():
+                    q.get_nowait()
+            time.sleep(0.005)
+    threading.Thread(target=drain, daemon=True).start()
+
+    histograms = {"ALL": Histogram()}
+    lag = Histogram()
+    origin = events[0]["t"]
+    start = time.perf_counter()
+    for event in events:
+        if speed:
+            due = (event["t"] - origin) / speed
+            delay = due - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -0.001:
+                lag.record(-delay * 1000.0)
+        words = [usernames.get(w, w) for w in event["m"].split()]
+        text = " ".join(words)
+        sender = senders.get(event["u"], f"replay-{event['u']}")
+        command = words[0] if words and words[0].startswith("/") else "chat"
+
+        t0 = time.perf_counter()
+        bot.handle_message(text, event["p"], sender)
+        ms = (time.perf_counter() - t0) * 1000.0
+        histograms.setdefault(command, Histogram()).record(ms)
+        histograms["ALL"].record(ms)
+    elapsed = time.perf_counter() - start
+    conversation_logger.flush()
+    stop.set()
+
+    print(f"\n{'command':<14} {'n':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for command, hist in sorted(histograms.items(), key=lambda kv: -kv[1].percentile(95)):
+        s = hist.summary()
+        print(f"{command:<14} {s['count']:>7} {s['p50_ms']:>9.2f} {s['p95_ms']:>9.2f} {s['p99_ms']:>9.2f}")
+    recorded_span = events[-1]["t"] - origin
+    print(f"\n✅ Replayed {len(events)} events in {elapsed:.1f}s ({len(events) / elapsed:.0f} msgs/sec; recorded span {recorded_span:.1f}s)")
+    if lag.count:
+        print(f"⏱️ Fell behind schedule on {lag.count} events (p95 lag {lag.percentile(95):.0f} ms)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -66,4 +66,6 @@ def verify_account_management():
     print("\n✅ Account Management Verification Complete!")
 
 if __name__ == "__main__":
+    from app.core.database import init_db
+    init_db()
     verify_account_management()
@@ -0,0 +1,92 @@
+import os
+import queue
+import tempfile
+import threading
+import time
+
+# Throwaway database and a short quiet window, set before the app reads its config
+_TMP = tempfile.TemporaryDirectory()
+os.environ["DB_NAME"] = os.path.join(_TMP.name, "coalesce.db")
+os.environ["CHAT_COALESCE_SECONDS"] = "0.2"
+os.environ["CHAT_COALESCE_MAX_WAIT_SECONDS"] = "2"
+
+from app.core.bot_core import UnifiedBot
+from app.core.database import init_db, register_user
+
+def make_bot():
+    """UnifiedBot with a Telegram queue and a stub LLM that records each request."""
+    outbox = queue.Queue()
+    bot = UnifiedBot({"telegram": outbox})
+    bot.rate_limiter = None
+    bot.llm_calls = []
+    bot.release = threading.Event()
+    bot.release.set()
+
+    def fake_reply(user_id, username, user_api_key, message, media_path=None):
+        bot.llm_calls.append(message)
+        bot.release.wait(10) # Lets a test hold a request in flight
+        return f"reply to {message!r}"
+    bot._generate_ai_reply = fake_reply
+    return bot, outbox
+
+def drain(outbox, wait=1.0):
+    items = []
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        try:
+            items.append(outbox.get(timeout=0.05))
+        except queue.Empty:
+            pass
+    return [(item["target"], item["text"]) for item in items]
+
+def verify_coalescer():
+    print("🧪 Verifying chat coalescing...")
+    init_db()
+    register_user("coalesce_user", "co@example.com", "pass123", platform="telegram", platform_id="co_tg")
+
+    print("\n[1] Messages inside the window become one request...")
+    bot, outbox = make_bot()
+    for text in ("hey", "are you there", "?"):
+        assert bot.handle_message(text, "telegram", "co_tg", reply_to="co_tg") is None
+    sent = drain(outbox)
+    assert bot.llm_calls == ["hey\nare you there\n?"], bot.llm_calls
+    assert sent == [("co_tg", "reply to 'hey\\nare you there\\n?'")], sent
+    print("✅ Three messages, one LLM call, one reply.")
+
+    print("\n[2] A message during an in-flight request supersedes it...")
+    bot, outbox = make_bot()
+    bot.release.clear()
+    bot.handle_message("first", "telegram", "co_tg", reply_to="co_tg")
+    deadline = time.monotonic() + 5
+    while not bot.llm_calls and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert bot.llm_calls == ["first"], "first request should be in flight"
+    bot.handle_message("second", "telegram", "co_tg", reply_to="co_tg")
+    time.sleep(0.4) # Second flush starts (and blocks) while the first is still running
+    bot.release.set()
+    sent = drain(outbox)
+    assert bot.llm_calls == ["first", "first\nsecond"], bot.llm_calls
+    assert sent == [("co_tg", "reply to 'first\\nsecond'")], f"superseded reply was delivered: {sent}"
+    print("✅ The stale reply is dropped; the newer request answers both messages.")
+
+    print("\n[3] Group messages are answered in the group...")
+    bot, outbox = make_bot()
+    bot.handle_message("hi group", "telegram", "co_tg", reply_to=-1001)
+    bot.handle_message("hi dm", "telegram", "co_tg", reply_to="co_tg")
+    sent = sorted(drain(outbox), key=str)
+    assert sent == sorted([(-1001, "reply to 'hi group'"), ("co_tg", "reply to 'hi dm'")], key=str), sent
+    print("✅ Each chat gets its own reply; group text is not merged into the DM.")
+
+    print("\n[4] Text still in the window is answered at shutdown...")
+    bot, outbox = make_bot()
+    bot.coalescer.window = 30
+    bot.handle_message("good night", "telegram", "co_tg", reply_to="co_tg")
+    assert bot.coalescer.pending() == 1
+    bot._flush_pending_chat() # What the process shutdown hook runs
+    sent = drain(outbox, wait=0.2)
+    assert sent == [("co_tg", "reply to 'good night'")], sent
+    assert bot.coalescer.pending() == 0
+    print("✅ flush_pending answered the buffered text before exit.")
+
+if __name__ == "__main__":
+    verify_coalescer()
@@ -45,4 +45,6 @@ def verify_core_logic():
     print("\n✅ Verification Complete!")
 
 if __name__ == "__main__":
+    from app.core.database import init_db
+    init_db()
     verify_core_logic()
@@ -0,0 +1,59 @@
+import os
+import sqlite3
+import tempfile
+
+# Throwaway database, set before the app reads its config
+_TMP = tempfile.TemporaryDirectory()
+os.environ["DB_NAME"] = os.path.join(_TMP.name, "dedup.db")
+
+from app.core.config import DB_NAME
+from app.core.database import init_db, purge_processed_events
+from app.core.dedup import DedupStore
+
+def query(sql, params=()):
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        rows = conn.execute(sql, params).fetchall()
+        conn.commit()
+        return rows
+    finally:
+        conn.close()
+
+def verify_dedup():
+    print("🧪 Verifying inbound message dedup...")
+    init_db()
+
+    print("\n[1] Redelivery is dropped...")
+    store = DedupStore(ttl=3600, capacity=3)
+    assert not store.is_duplicate("telegram", "chat1:1"), "first delivery must go through"
+    assert store.is_duplicate("telegram", "chat1:1"), "second delivery must be dropped"
+    assert not store.is_duplicate("whatsapp", "chat1:1"), "ids are scoped per platform"
+    assert not store.is_duplicate("telegram", None), "messages without an id are never dropped"
+    print("✅ Second claim dropped.")
+
+    print("\n[2] Claims outlive the in-memory ring...")
+    for i in range(10): # Pushes telegram:chat1:1 out of the 3-entry ring
+        store.is_duplicate("telegram", f"filler:{i}")
+    assert "telegram:chat1:1" not in store._recent
+    assert store.is_duplicate("telegram", "chat1:1"), "evicted id must still be caught by processed_events"
+    restarted = DedupStore(ttl=3600, capacity=3) # Fresh process after a restart
+    assert restarted.is_duplicate("telegram", "chat1:1")
+    print("✅ processed_events catches ids the ring evicted, and survives a restart.")
+
+    print("\n[3] TTL sweep...")
+    query("UPDATE processed_events SET seen_at = datetime('now', '-2 hours') WHERE event_key = 'telegram:chat1:1'")
+    removed = purge_processed_events(3600)
+    keys = {row[0] for row in query("SELECT event_key FROM processed_events")}
+    assert removed == 1 and "telegram:chat1:1" not in keys, f"expired id not purged ({removed} removed)"
+    assert "telegram:filler:9" in keys, "recent ids must survive the sweep"
+    assert not DedupStore(ttl=3600).is_duplicate("telegram", "chat1:1"), "a purged id may be processed again"
+    print("✅ Only ids older than the TTL are purged.")
+
+    print("\n[4] Database errors fail open...")
+    query("DROP TABLE processed_events")
+    broken = DedupStore(ttl=3600)
+    assert not broken.is_duplicate("telegram", "chat2:1"), "a dedup failure must not drop the message"
+    print("✅ Messages go through when the dedup table is unavailable.")
+
+if __name__ == "__main__":
+    verify_dedup()
@@ -0,0 +1,31 @@
+import zlib
+from app.core.security import SecurityManager
+
+SAMPLES = [
+    "hello",
+    "\x00hello", # Starts with NUL: must not be mistaken for a compressed payload
+    "\x00z not zlib",
+    "héllo 😀 " * 3,
+    "long reply, repeated until compression is worth it. " * 20,
+    "\x00" + "y" * 600,
+]
+
+def verify_encryption():
+    print("🧪 Verifying encrypted payload formats...")
+    for mode in ("off", "zlib", "zstd"):
+        manager = SecurityManager(compression=mode, min_compress_bytes=16)
+        for text in SAMPLES:
+            assert manager.decrypt(manager.encrypt(text)) == text, f"{mode}: round trip failed for {text[:20]!r}"
+    print("✅ Round trips with compression off, zlib and zstd.")
+
+    manager = SecurityManager()
+    assert manager.compression == "off", "compression must be opt-in"
+    for text in ("plain old row", "\x00hello"):
+        legacy = manager.fernet.encrypt(text.encode()).decode() # Written before the format byte existed
+        assert manager.decrypt(legacy) == text, f"legacy token misread: {text!r}"
+    interim = manager.fernet.encrypt(b"\x00z" + zlib.compress(b"a" * 300)).decode()
+    assert manager.decrypt(interim) == "a" * 300
+    print("✅ Legacy tokens (including ones starting with NUL) read back unchanged.")
+
+if __name__ == "__main__":
+    verify_encryption()
@@ -6,6 +6,37 @@ load_dotenv()
 import sys
 sys.stdout.reconfigure(encoding='utf-8')
 
+def verify_key_isolation():
+    """Offline: each user's request must reach Gemini with that user's key, whatever key was configured last."""
+    print("🔑 Checking per-key Gemini clients...")
+    from unittest import mock
+    from google.ai import generativelanguage as glm
+    from app.features.llm_handler import _load_genai
+
+    requests_by_key = {}
+
+    class FakeClient:
+        """Stands in for GenerativeServiceClient: records which key each request was sent with."""
+        def __init__(self, client_options=None, **kwargs):
+            self.api_key = (client_options or {}).get("api_key")
+
+        def generate_content(self, request, **kwargs):
+            text = request.contents[-1].parts[0].text
+            requests_by_key.setdefault(self.api_key, []).append(text)
+            return glm.GenerateContentResponse(candidates=[glm.Candidate(
+                content=glm.Content(role="model", parts=[glm.Part(text=f"reply to {text}")]), finish_reason=1)])
+
+    genai = _load_genai()
+    handler = GeminiHandler(api_key="server-key")
+    with mock.patch.object(glm, "GenerativeServiceClient", FakeClient):
+        for key in ("key-a", "key-b", "key-a"):
+            genai.configure(api_key="last-configured-key") # What another thread may have done meanwhile
+            reply = handler.generate_response(f"from {key}", user_api_key=key, system_instruction="prompt", prompt_key="p1")
+            assert reply == f"reply to from {key}", reply
+
+    assert requests_by_key == {"key-a": ["from key-a", "from key-a"], "key-b": ["from key-b"]}, requests_by_key
+    print("✅ Each user's request went out with their own key.")
+
 def verify_gemini():
     print("🔍 Checking Google API Key...")
     api_key = os.getenv("GOOGLE_API_KEY")
@@ -28,4 +59,5 @@ def verify_gemini():
         print(f"❌ Error during verification: {e}")
 
 if __name__ == "__main__":
+    verify_key_isolation()
     verify_gemini()
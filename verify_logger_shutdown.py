@@ -0,0 +1,58 @@
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+
+# Throwaway database, set before the app reads its config
+_TMP = tempfile.TemporaryDirectory()
+os.environ["DB_NAME"] = os.path.join(_TMP.name, "logger.db")
+
+from app.core.config import DB_NAME
+from app.core.database import init_db
+
+TURNS = 20
+
+def child(ready):
+    """A bot-like process: queues turns that are not committed yet, then waits to be terminated."""
+    from app.core.shutdown import install_shutdown_hook
+    install_shutdown_hook() # What every supervised process installs
+    from app.core.conversation_logger import ConversationLogger, conversation_logger
+    ConversationLogger.FLUSH_INTERVAL = 60 # Keep the partial batch pending until shutdown
+    for i in range(TURNS):
+        conversation_logger.log(1, f"message {i}", f"response {i}")
+    ready.set()
+    while True:
+        time.sleep(0.1)
+
+def count_rows():
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM conversations").fetchone()[0]
+    finally:
+        conn.close()
+
+def verify_logger_shutdown():
+    print("🧪 Verifying conversation log flush when a bot process is terminated...")
+    init_db()
+    conn = sqlite3.connect(DB_NAME)
+    conn.execute("INSERT INTO users (id, username, password_hash) VALUES (1, 'logger', 'x')")
+    conn.commit()
+    conn.close()
+
+    ready = multiprocessing.Event()
+    proc = multiprocessing.Process(target=child, args=(ready,), name="LoggerChild")
+    proc.start()
+    assert ready.wait(30), "child never queued its turns"
+    before = count_rows()
+    proc.terminate() # SIGTERM, as the supervisor sends on restart
+    proc.join(30)
+    after = count_rows()
+
+    print(f"Rows before terminate: {before}, after: {after}, child exit code: {proc.exitcode}")
+    assert before < TURNS, "turns were committed before the terminate; nothing was tested"
+    assert after == TURNS, f"expected {TURNS} rows after shutdown, found {after}"
+    print("✅ Pending conversation turns were committed on terminate.")
+
+if __name__ == "__main__":
+    verify_logger_shutdown()
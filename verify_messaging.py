@@ -75,4 +75,6 @@ def verify_messaging():
     safe_print("\n[+] Advanced Messaging Verification Complete!")
 
 if __name__ == "__main__":
+    from app.core.database import init_db
+    init_db()
     verify_messaging()
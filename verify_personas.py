@@ -0,0 +1,78 @@
+import os
+import sqlite3
+import tempfile
+
+# Throwaway database, set before the app reads its config
+_TMP = tempfile.TemporaryDirectory()
+os.environ["DB_NAME"] = os.path.join(_TMP.name, "personas.db")
+
+from app.core.config import DB_NAME
+from app.core.database import (init_db, update_system_prompt, get_user_system_prompt, get_user_by_platform,
+                               create_persona)
+from app.core.personas import BUILTIN_PERSONAS
+from app.core.security import security_manager
+
+ROAST = BUILTIN_PERSONAS[1][2] # id 2
+CUSTOM = "You are a pirate who only talks about the sea."
+
+def query(sql, params=()):
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        rows = conn.execute(sql, params).fetchall()
+        conn.commit()
+        return rows
+    finally:
+        conn.close()
+
+def persona_row(user_id):
+    return query("SELECT persona_id, system_prompt FROM users WHERE id = ?", (user_id,))[0]
+
+def verify_personas():
+    print("🧪 Verifying shared personas...")
+    init_db()
+
+    print("\n[1] One-time migration of encrypted built-in copies...")
+    # Rows as the old code wrote them: every persona encrypted per user, no persona_id
+    query("INSERT INTO users (id, username, password_hash, telegram_id, system_prompt) VALUES (1, 'roaster', 'x', 'tg_1', ?)",
+          (security_manager.encrypt(ROAST),))
+    query("INSERT INTO users (id, username, password_hash, telegram_id, system_prompt) VALUES (2, 'pirate', 'x', 'tg_2', ?)",
+          (security_manager.encrypt(CUSTOM),))
+    query("INSERT INTO users (id, username, password_hash) VALUES (3, 'blank', 'x')")
+    query("UPDATE system_meta SET value = 0 WHERE key = 'personas_migrated'")
+    init_db()
+
+    assert persona_row(1) == (2, None), f"built-in copy not migrated: {persona_row(1)}"
+    pid, enc = persona_row(2)
+    assert pid is None and enc and enc != CUSTOM, "custom text must stay encrypted"
+    assert security_manager.decrypt(enc) == CUSTOM
+    assert persona_row(3) == (None, None)
+    print("✅ Built-in copy became persona_id = 2 with system_prompt NULL; custom text stayed encrypted.")
+
+    print("\n[2] Reads resolve both kinds...")
+    assert get_user_system_prompt(1) == ROAST
+    assert get_user_system_prompt(2) == CUSTOM
+    assert get_user_system_prompt(3) is None
+    assert get_user_by_platform("telegram", "tg_1")[3] == ROAST
+    assert get_user_by_platform("telegram", "tg_2")[3] == CUSTOM
+    print("✅ get_user_system_prompt and get_user_by_platform return the persona text.")
+
+    print("\n[3] Writes reference shared personas, encrypt only custom text...")
+    update_system_prompt(2, BUILTIN_PERSONAS[3][2])
+    assert persona_row(2) == (4, None)
+    update_system_prompt(1, CUSTOM)
+    pid, enc = persona_row(1)
+    assert pid is None and security_manager.decrypt(enc) == CUSTOM
+    shared_id = create_persona("pirate", CUSTOM + " Arr.")
+    update_system_prompt(3, CUSTOM + " Arr.")
+    assert persona_row(3) == (shared_id, None), "text of a shared persona must be stored by reference"
+    assert get_user_system_prompt(3) == CUSTOM + " Arr."
+    print("✅ update_system_prompt stores ids for shared personas and encrypts custom prompts.")
+
+    print("\n[4] Migration runs once...")
+    query("UPDATE users SET system_prompt = ?, persona_id = NULL WHERE id = 2", (security_manager.encrypt(ROAST),))
+    init_db()
+    assert persona_row(2)[0] is None, "init_db must not re-run the migration"
+    print("✅ Later startups leave users untouched.")
+
+if __name__ == "__main__":
+    verify_personas()
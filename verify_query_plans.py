@@ -0,0 +1,270 @@
+import argparse
+import json
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Point the app at a throwaway database before anything imports the config
+_TMP = tempfile.TemporaryDirectory()
+os.environ["DB_NAME"] = os.path.join(_TMP.name, "plans.db")
+
+import bcrypt
+from app.core import database as db
+from app.core.config import DB_NAME
+
+# Tables that grow with users/traffic: a plain SCAN over one of these is a regression
+INDEXED_TABLES = {
+    "users", "friends", "follows", "posts", "post_views", "reactions", "stories", "private_messages",
+    "conversations", "conversation_archive", "blocked_users", "user_states", "friend_suggestions",
+    "processed_events",
+}
+
+# (function, table) pairs that scan on purpose
+ALLOWED_SCANS = {
+    ("get_all_users_for_broadcast", "users"): "broadcast reads every user",
+    ("search_users", "users"): "substring LIKE '%q%' cannot use a b-tree index",
+    ("get_social_feed", "posts"): "newest public posts walk the rowid backwards",
+    ("store_friend_suggestions", "friend_suggestions"): "replace_all rebuild clears the table",
+    ("recover_account", "users"): "recovery keys are Fernet-encrypted, so every row is decrypted and compared",
+}
+
+PASSWORD = "plans-password"
+
+def seed(n_users, rng):
+    """Deterministic population: users, friendships, follows, posts, views, reactions, stories, DMs, chat turns."""
+    password_hash = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=4)).decode()
+    conn = sqlite3.connect(DB_NAME)
+    c = conn.cursor()
+    c.executemany("INSERT INTO users (username, password_hash, whatsapp_id, telegram_id, preferred_platform, recovery_key) VALUES (?, ?, ?, ?, ?, ?)",
+                  [(f"user{i}", password_hash, f"wa{i}", f"tg{i}", "telegram" if i % 2 else "whatsapp", f"rk{i}") for i in range(n_users)])
+    ids = [r[0] for r in c.execute("SELECT id FROM users ORDER BY id")]
+    edges = {(min(u, v), max(u, v)) for u in ids for v in rng.sample(ids, 5) if u != v}
+    c.executemany("INSERT INTO friends (user1_id, user2_id, status) VALUES (?, ?, ?)",
+                  [(a, b, "accepted" if rng.random() < 0.9 else "pending") for a, b in sorted(edges)])
+    c.executemany("INSERT OR IGNORE INTO follows (follower_id, followed_id) VALUES (?, ?)", [(u, rng.choice(ids)) for u in ids for _ in range(3)])
+    c.executemany("INSERT INTO posts (user_id, content, visibility) VALUES (?, ?, ?)",
+                  [(rng.choice(ids), f"post {i}", rng.choice(["public", "public", "private"])) for i in range(n_users * 2)])
+    c.executemany("INSERT INTO post_views (post_id, viewer_id) VALUES (?, ?)", [(rng.randint(1, n_users * 2), rng.choice(ids)) for _ in range(n_users * 5)])
+    c.executemany("INSERT INTO reactions (post_id, story_id, user_id) VALUES (?, ?, ?)",
+                  [(rng.randint(1, n_users * 2), None, rng.choice(ids)) if i % 2 else (None, rng.randint(1, n_users), rng.choice(ids))
+                   for i in range(n_users * 2)])
+    now = datetime.now()
+    c.executemany("INSERT INTO stories (user_id, content, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                  [(rng.choice(ids), f"story {i}", now.strftime('%Y-%m-%d %H:%M:%S'),
+                    (now + timedelta(hours=rng.choice([-2, 6, 12]))).strftime('%Y-%m-%d %H:%M:%S')) for i in range(n_users)])
+    c.executemany("INSERT INTO private_messages (from_id, to_id, content, is_read) VALUES (?, ?, ?, ?)",
+                  [(rng.choice(ids), rng.choice(ids), "hi", rng.random() < 0.5) for _ in range(n_users * 3)])
+    c.executemany("INSERT INTO conversations (user_id, message, response) VALUES (?, ?, ?)",
+                  [(rng.choice(ids), "q", "a") for _ in range(n_users * 5)])
+    c.executemany("INSERT OR IGNORE INTO blocked_users (user_id, blocked_user_id) VALUES (?, ?)", [(rng.choice(ids), rng.choice(ids)) for _ in range(n_users // 10)])
+    conn.commit()
+    conn.close()
+    return ids
+
+def build_calls(ids, rng):
+    """One representative call per public function. Mutating calls are safe to repeat."""
+    u, v = ids[len(ids) // 2], ids[len(ids) // 2 + 1]
+    uname, vname = f"user{u - ids[0]}", f"user{v - ids[0]}"
+    return {
+        "register_user": lambda: db.register_user(f"new{rng.random()}", None, PASSWORD, "telegram", f"tg_new{rng.random()}"),
+        "update_system_prompt": lambda: db.update_system_prompt(u, "You are kind."),
+        "get_user_system_prompt": lambda: db.get_user_system_prompt(u),
+        "set_user_persona": lambda: db.set_user_persona(u, 2),
+        "get_personas": lambda: db.get_personas(),
+        "create_persona": lambda: db.create_persona(f"plan{rng.random()}", "You are calm."),
+        "get_user_by_platform": lambda: db.get_user_by_platform("telegram", f"tg{u - ids[0]}"),
+        "get_user_by_username": lambda: db.get_user_by_username(uname),
+        "verify_user": lambda: db.verify_user(uname, PASSWORD),
+        "update_platform_id": lambda: db.update_platform_id(u, "telegram", f"tg{u - ids[0]}"),
+        "update_last_seen": lambda: db.update_last_seen(u),
+        "change_password": lambda: db.change_password(u, PASSWORD),
+        "change_username": lambda: db.change_username(u, uname),
+        "recover_account": lambda: db.recover_account("rk-missing", PASSWORD),
+        "set_api_key": lambda: db.set_api_key(u, "key"),
+        "get_user_api_key": lambda: db.get_user_api_key(u),
+        "get_user_by_id": lambda: db.get_user_by_id(u),
+        "log_conversation": lambda: db.log_conversation(u, "q", "a"),
+        "set_state": lambda: db.set_state("tg_plan", "telegram", "S", {"a": 1}),
+        "get_state": lambda: db.get_state("tg_plan"),
+        "clear_state": lambda: db.clear_state("tg_plan"),
+        "purge_stale_states": lambda: db.purge_stale_states(3600),
+        "claim_event": lambda: db.claim_event(f"telegram:plan:{rng.random()}"),
+        "purge_processed_events": lambda: db.purge_processed_events(3600),
+        "send_friend_request": lambda: db.send_friend_request(u, vname),
+        "get_friend_requests": lambda: db.get_friend_requests(u),
+        "accept_friend_request": lambda: db.accept_friend_request(v, uname),
+        "get_friends": lambda: db.get_friends(u),
+        "create_group": lambda: db.create_group("plans", u),
+        "join_group": lambda: db.join_group("missing", u),
+        "set_user_personalization": lambda: db.set_user_personalization(u, mood="calm"),
+        "get_user_personalization": lambda: db.get_user_personalization(u),
+        "submit_report": lambda: db.submit_report(u, "plan", "text"),
+        "get_chat_history": lambda: db.get_chat_history(u),
+        "block_user": lambda: db.block_user(u, vname),
+        "unblock_user": lambda: db.unblock_user(u, vname),
+        "is_blocked": lambda: db.is_blocked(u, v),
+        "set_preferred_platform": lambda: db.set_preferred_platform(u, "telegram"),
+        "get_user_contact_info": lambda: db.get_user_contact_info(vname),
+        "log_private_message": lambda: db.log_private_message(u, v, "hi"),
+        "set_active_chat": lambda: db.set_active_chat(u, None),
+        "get_active_chat": lambda: db.get_active_chat(u),
+        "remove_friend": lambda: db.remove_friend(u, f"user{len(ids) - 1}"),
+        "create_post": lambda: db.create_post(u, "plan post"),
+        "create_story": lambda: db.create_story(u, "plan story"),
+        "send_private_message": lambda: db.send_private_message(u, vname, "hi"),
+        "get_private_messages": lambda: db.get_private_messages(u),
+        "get_inbox": lambda: db.get_inbox(u, before_id=len(ids)),
+        "get_unread_count": lambda: db.get_unread_count(u),
+        "mark_inbox_read": lambda: db.mark_inbox_read(u),
+        "get_social_feed": lambda: db.get_social_feed(),
+        "get_active_stories": lambda: db.get_active_stories(),
+        "purge_expired_stories": lambda: db.purge_expired_stories(),
+        "react_to_content": lambda: db.react_to_content(u, post_id=1),
+        "get_reactions_count": lambda: db.get_reactions_count(post_id=1),
+        "set_verified_status": lambda: db.set_verified_status(u, 1),
+        "get_all_users_for_broadcast": lambda: db.get_all_users_for_broadcast(),
+        "search_users": lambda: db.search_users("user1"),
+        "get_mutual_friends_count": lambda: db.get_mutual_friends_count(u, v),
+        "are_friends": lambda: db.are_friends(u, v),
+        "follow_user": lambda: db.follow_user(u, vname),
+        "unfollow_user": lambda: db.unfollow_user(u, vname),
+        "get_follow_status": lambda: db.get_follow_status(u, v),
+        "set_professional_account": lambda: db.set_professional_account(u, 1),
+        "log_post_view": lambda: db.log_post_view(1, u),
+        "get_post_analytics": lambda: db.get_post_analytics(1),
+        "get_follower_ids": lambda: db.get_follower_ids(u),
+        "update_post_visibility": lambda: db.update_post_visibility(1, u, "public"),
+        "get_friend_suggestions": lambda: db.get_friend_suggestions(u),
+        "store_friend_suggestions": lambda: db.store_friend_suggestions({u: [(v, 1)]}),
+        "pop_dirty_suggestion_users": lambda: db.pop_dirty_suggestion_users(),
+    }
+
+class SqlCapture:
+    """Wraps sqlite3.connect so every statement a DB function runs is traced (with bound values expanded)."""
+    def __init__(self):
+        self.statements = []
+        self._connect = sqlite3.connect
+
+    def __enter__(self):
+        def traced_connect(*args, **kwargs):
+            conn = self._connect(*args, **kwargs)
+            conn.set_trace_callback(self.statements.append)
+            return conn
+        sqlite3.connect = traced_connect
+        return self
+
+    def __exit__(self, *exc):
+        sqlite3.connect = self._connect
+        return False
+
+PLANNED = re.compile(r"^\s*(SELECT|UPDATE|DELETE|WITH|INSERT\s+INTO\s+\w+\s*(\([^)]*\))?\s*SELECT)", re.I)
+SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?(.*)$")
+
+def explain(sql):
+    conn = sqlite3.connect(DB_NAME)
+    try:
+        return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+    except sqlite3.Error:
+        return []
+    finally:
+        conn.close()
+
+def check_plans(name, statements):
+    """Returns the offending (table, sql) pairs for one function."""
+    problems, seen = [], set()
+    for sql in statements:
+        if not PLANNED.match(sql) or sql in seen:
+            continue
+        seen.add(sql)
+        for detail in explain(sql):
+            m = SCAN.match(detail)
+            if not m:
+                continue
+            table, rest = m.group(1), m.group(2)
+            if table in INDEXED_TABLES and "INDEX" not in rest and (name, table) not in ALLOWED_SCANS:
+                problems.append((table, sql.strip()[:160]))
+    return problems
+
+def time_call(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception:
+            pass # Errors were recorded on the checked run; this only times
+        samples.append((time.perf_counter() - start) * 1000.0)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when a database.py query falls back to a full table scan")
+    parser.add_argument("--scales", default="200,2000", help="comma-separated user counts to seed")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write per-function timings to this file")
+    args = parser.parse_args()
+    scales = [int(s) for s in args.scales.split(",")]
+
+    public = sorted(n for n, f in vars(db).items() if callable(f) and not n.startswith("_")
+                    and getattr(f, "__module__", None) == db.__name__ and n != "init_db")
+    timings = {}
+    failures = {}
+    errors = {}
+    for scale in scales:
+        if os.path.exists(DB_NAME):
+            os.remove(DB_NAME)
+        db.init_db()
+        rng = random.Random(scale)
+        ids = seed(scale, rng)
+        db.social_graph.load() # Seeded rows bypass the graph-version bump
+        calls = build_calls(ids, rng)
+        print(f"🧪 Scale {scale} users")
+        for name in public:
+            fn = calls.get(name)
+            if fn is None:
+                continue
+            with SqlCapture() as capture:
+                try:
+                    fn()
+                except Exception as e:
+                    errors[name] = f"{type(e).__name__}: {e}"
+            for table, sql in check_plans(name, capture.statements):
+                failures.setdefault(name, {})[table] = sql
+            timings.setdefault(name, {})[scale] = round(time_call(fn, args.repeat), 3)
+
+    header = "".join(f"{s:>10}" for s in scales)
+    print(f"\n{'function (median ms)':<30}{header}")
+    for name in sorted(timings, key=lambda n: -timings[n][scales[-1]]):
+        print(f"{name:<30}" + "".join(f"{timings[name][s]:>10.2f}" for s in scales))
+
+    uncovered = [n for n in public if n not in timings]
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"scales": scales, "timings": timings}, f, indent=2)
+
+    status = 0
+    if failures:
+        print("\n❌ Full table scans on indexed tables:")
+        for name, tables in sorted(failures.items()):
+            for table, sql in tables.items():
+                print(f"  {name}: SCAN {table}\n      {sql}")
+        status = 1
+    if uncovered: # A new query nobody exercises is never plan-checked
+        print(f"\n❌ No representative call for: {', '.join(uncovered)} (add them to build_calls)")
+        status = 1
+    if errors: # A call that raises records little or no SQL, so its plans went unchecked
+        print("\n❌ Representative calls that raised:")
+        for name, err in sorted(errors.items()):
+            print(f"  {name}: {err}")
+        status = 1
+    if status == 0:
+        print("\n✅ All query plans use indexes.")
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
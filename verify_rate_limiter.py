@@ -0,0 +1,83 @@
+import os
+import tempfile
+
+# Throwaway database and deterministic limits, set before the app reads its config
+_TMP = tempfile.TemporaryDirectory()
+os.environ["DB_NAME"] = os.path.join(_TMP.name, "ratelimit.db")
+os.environ["CHAT_COALESCE_SECONDS"] = "0"
+
+from app.core import rate_limiter as rate_limiter_module
+from app.core.rate_limiter import RateLimiter
+
+LIMITS = {"chat": (60.0, 3), "command": (30.0, 2), "heavy": (6.0, 1), "auth": (6.0, 2)}
+
+class FakeClock:
+    """Replaces the limiter's `time` module so refills are exact."""
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+def verify_buckets(clock):
+    print("\n[1] Burst and refill per rate class...")
+    limiter = RateLimiter(limits=LIMITS, llm_per_minute=60, llm_burst=1)
+    samples = {"chat": "hello there", "command": "/friends", "heavy": "/imagine a cat", "auth": "/login bob secret"}
+    for cls, message in samples.items():
+        per_minute, burst = LIMITS[cls]
+        assert limiter.classify(message) == cls, f"{message!r} should be {cls}"
+        for i in range(burst):
+            assert limiter.check("telegram", "u1", message)[0], f"{cls}: message {i + 1} is within the burst"
+        assert not limiter.check("telegram", "u1", message)[0], f"{cls}: burst + 1 must be limited"
+        assert limiter.check("telegram", "u2", message)[0], f"{cls}: another sender has their own bucket"
+        clock.now += 60.0 / per_minute # Exactly one token
+        assert limiter.check("telegram", "u1", message)[0], f"{cls}: one token after 1/rate seconds"
+        assert not limiter.check("telegram", "u1", message)[0], f"{cls}: only one token refilled"
+    for command in ("/login", "/otp_login", "/verify", "/register", "/start"):
+        assert limiter.classify(command + " x") == "auth", command
+    print("✅ Each class bursts to its limit and refills at its rate; /login and friends use the auth class.")
+
+def verify_warning(clock):
+    print("\n[2] One warning, then silent drops...")
+    limiter = RateLimiter(limits=LIMITS)
+    results = [limiter.check("whatsapp", "spammer", "hi") for _ in range(6)]
+    assert [r[0] for r in results] == [True, True, True, False, False, False]
+    assert [r[1] for r in results[3:]] == [True, False, False], results
+    clock.now += 1.0
+    assert limiter.check("whatsapp", "spammer", "hi") == (True, False)
+    assert limiter.check("whatsapp", "spammer", "hi") == (False, True), "a new streak warns again"
+    print("✅ The first rejected message of a streak warns; the rest are dropped silently.")
+
+def verify_llm_fallback():
+    print("\n[3] Local reply when the LLM budget is spent...")
+    from app.core.bot_core import UnifiedBot
+    from app.core.database import init_db, register_user
+
+    init_db()
+    register_user("ratelimit_user", "rl@example.com", "pass123", platform="telegram", platform_id="rl_tg")
+    bot = UnifiedBot(None)
+    bot.rate_limiter = RateLimiter(limits={cls: (600.0, 100) for cls in LIMITS}, llm_per_minute=0.001, llm_burst=1)
+    calls = []
+    bot.chatbot.generate_response = lambda message, **kwargs: calls.append(message) or "llm reply"
+
+    first = bot.handle_message("tell me a joke", "telegram", "rl_tg")
+    second = bot.handle_message("hello friend", "telegram", "rl_tg")
+    print(f"First: {first!r}\nSecond: {second!r}")
+    assert first == "llm reply" and calls == ["tell me a joke"], "the first message fits the budget"
+    assert second and second != "llm reply" and len(calls) == 1, "over budget: answered locally, no LLM call"
+    print("✅ Over the LLM budget, chat is answered by the local templates.")
+
+def verify_rate_limiter():
+    print("🧪 Verifying inbound rate limiting...")
+    clock = FakeClock()
+    real_time = rate_limiter_module.time
+    rate_limiter_module.time = clock
+    try:
+        verify_buckets(clock)
+        verify_warning(clock)
+    finally:
+        rate_limiter_module.time = real_time
+    verify_llm_fallback()
+
+if __name__ == "__main__":
+    verify_rate_limiter()
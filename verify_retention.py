@@ -0,0 +1,41 @@
+import os
+import sqlite3
+import tempfile
+
+# Throwaway database and a small hot set, set before the app reads its config
+_TMP = tempfile.TemporaryDirectory()
+os.environ["DB_NAME"] = os.path.join(_TMP.name, "retention.db")
+os.environ["CONVERSATION_HOT_TURNS"] = "3"
+
+from app.core.config import DB_NAME
+from app.core.database import init_db, get_chat_history
+from app.core.retention import RetentionManager
+from app.core.security import security_manager
+
+TURNS = 12
+
+def verify_retention():
+    print("🧪 Verifying conversation archive round trip...")
+    init_db()
+    conn = sqlite3.connect(DB_NAME)
+    conn.execute("INSERT INTO users (id, username, password_hash) VALUES (1, 'archivist', 'x')")
+    conn.executemany("INSERT INTO conversations (user_id, message, response, timestamp) VALUES (1, ?, ?, datetime('now', ?))",
+                     [(security_manager.encrypt(f"message {i}"), security_manager.encrypt(f"response {i}"), f"-{60 - i} days")
+                      for i in range(TURNS)])
+    conn.commit()
+    conn.close()
+
+    expected = [(f"message {i}", f"response {i}") for i in range(TURNS)]
+    manager = RetentionManager(retention_days=30, hot_turns=3)
+    manager.BLOCK_TURNS = 4 # Several blocks, so reading back crosses block boundaries
+    archived = manager.run_once()
+    print(f"Archived {archived} turns")
+    assert archived == TURNS - 3, f"expected {TURNS - 3} archived turns, got {archived}"
+
+    assert get_chat_history(1, limit=3) == expected[-3:], "hot turns alone must not touch the archive"
+    assert get_chat_history(1, limit=10) == expected[-10:], get_chat_history(1, limit=10)
+    assert get_chat_history(1, limit=50) == expected
+    print("✅ get_chat_history tops up from archive blocks in order once the hot turns run out.")
+
+if __name__ == "__main__":
+    verify_retention()
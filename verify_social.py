@@ -61,4 +61,6 @@ def verify_social():
     print("\n[+] Social Verification Complete!")
 
 if __name__ == "__main__":
+    from app.core.database import init_db
+    init_db()
     verify_social()
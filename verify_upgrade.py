@@ -50,6 +50,8 @@ def test_bot_commands():
         print("❌ about command not updated.")
 
 if __name__ == "__main__":
+    from app.core.database import init_db
+    init_db()
     test_onboarding_flow()
     test_error_handling()
     test_bot_commands()